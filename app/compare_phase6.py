@@ -2,10 +2,16 @@
 Phase 6実装後のmain_original_backup.py と main.py の機能比較スクリプト
 """
 import ast
+import re
 import sys
 from pathlib import Path
 from typing import Dict, List, Set, Any
 
+# schedule_task_reminders の呼び出し（to_thread / run_in_executor に関数として渡す呼び出しを含む）
+_REMINDER_CALL_RE = re.compile(r"schedule_task_reminders\(|(?:to_thread|run_in_executor)\([^\n]*\bschedule_task_reminders\b")
+# 関数を引数で受け取って実行する呼び出し → 実行される関数の引数位置
+_EXECUTOR_CALLS = {"to_thread": 0, "run_in_executor": 1}
+
 def extract_function_definitions(file_path: Path) -> Dict[str, Dict]:
     """関数定義を抽出"""
     try:
@@ -43,6 +49,14 @@ def extract_function_calls(file_path: Path, func_name: str) -> List[str]:
         if isinstance(node, ast.Call):
             if isinstance(node.func, ast.Name) and node.func.id == func_name:
                 calls.append(f"line {node.lineno}")
+                continue
+            # asyncio.to_thread(func, ...) / loop.run_in_executor(executor, func, ...) も呼び出しとして数える
+            executor_name = node.func.attr if isinstance(node.func, ast.Attribute) else getattr(node.func, "id", None)
+            index = _EXECUTOR_CALLS.get(executor_name)
+            if index is not None and len(node.args) > index:
+                arg = node.args[index]
+                if isinstance(arg, ast.Name) and arg.id == func_name:
+                    calls.append(f"line {node.lineno}")
     return calls
 
 def check_phase6_functions():
@@ -97,6 +111,9 @@ def check_phase6_functions():
     
     return results
 
+# task_complete処理の分岐
+_TASK_COMPLETE_MARKER = 'if action_id == "task_complete":'
+
 def compare_task_complete_handling():
     """task_complete処理の比較"""
     original_path = Path("main_original_backup.py")
@@ -107,15 +124,11 @@ def compare_task_complete_handling():
     # 元のファイルでの処理
     try:
         original_content = original_path.read_text(encoding="utf-8")
-        original_lines = original_content.splitlines()
         
-        original_has = False
-        original_line = None
-        for i, line in enumerate(original_lines, 1):
-            if 'if action_id == "task_complete":' in line:
-                original_has = True
-                original_line = i
-                break
+        # 行に分割せず、ファイル全体への str.find で最初の出現位置を探す（見つかった時点で走査終了）
+        pos = original_content.find(_TASK_COMPLETE_MARKER)
+        original_has = pos != -1
+        original_line = original_content.count("\n", 0, pos) + 1 if original_has else None
     except Exception as e:
         print(f"  ✗ エラー: {e}")
         return
@@ -123,17 +136,12 @@ def compare_task_complete_handling():
     # 新しいファイルでの処理
     try:
         new_content = new_path.read_text(encoding="utf-8")
-        new_lines = new_content.splitlines()
         
-        new_has = False
-        new_line = None
-        uses_service = False
-        for i, line in enumerate(new_lines, 1):
-            if 'if action_id == "task_complete":' in line:
-                new_has = True
-                new_line = i
-            if 'mark_task_complete' in line:
-                uses_service = True
+        # 新しいファイルは最後の出現位置を使う（末尾から探す）
+        pos = new_content.rfind(_TASK_COMPLETE_MARKER)
+        new_has = pos != -1
+        new_line = new_content.count("\n", 0, pos) + 1 if new_has else None
+        uses_service = new_content.find("mark_task_complete") != -1
     except Exception as e:
         print(f"  ✗ エラー: {e}")
         return
@@ -165,7 +173,7 @@ def compare_schedule_task_reminders():
         
         original_calls = []
         for i, line in enumerate(original_lines, 1):
-            if "schedule_task_reminders(" in line and not line.strip().startswith("def"):
+            if _REMINDER_CALL_RE.search(line) and not line.lstrip().startswith("def"):
                 original_calls.append(f"line {i}: {line.strip()[:80]}")
     except Exception as e:
         print(f"  ✗ エラー: {e}")
@@ -178,7 +186,7 @@ def compare_schedule_task_reminders():
         
         new_calls = []
         for i, line in enumerate(new_lines, 1):
-            if "schedule_task_reminders(" in line and not line.strip().startswith("def"):
+            if _REMINDER_CALL_RE.search(line) and not line.lstrip().startswith("def"):
                 new_calls.append(f"line {i}: {line.strip()[:80]}")
     except Exception as e:
         print(f"  ✗ エラー: {e}")
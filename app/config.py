@@ -2,10 +2,11 @@
 アプリケーション設定管理モジュール
 環境変数の読み込み、クライアント初期化、ディレクトリパスの定義
 """
+import logging
 import os
 from pathlib import Path
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 from slack_sdk import WebClient
 
 # 環境変数の読み込み
@@ -17,6 +18,8 @@ load_dotenv()
 
 # OpenAI設定
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
+# 要約に渡す文字起こしの最大文字数（超過分は切り捨て、約2.5万トークン相当）
+SUMMARY_MAX_CHARS = int(os.getenv("SUMMARY_MAX_CHARS", "100000"))
 
 # Slack設定
 SLACK_BOT_TOKEN = os.getenv("SLACK_BOT_TOKEN", "")
@@ -41,11 +44,30 @@ GOOGLE_DRIVE_WATCH_ENABLED = os.getenv("GOOGLE_DRIVE_WATCH_ENABLED", "false").lo
 GOOGLE_DRIVE_WEBHOOK_SECRET = os.getenv("GOOGLE_DRIVE_WEBHOOK_SECRET", "")
 # Google Drive ポーリング間隔（秒、デフォルト1分）
 GOOGLE_DRIVE_POLL_INTERVAL = int(os.getenv("GOOGLE_DRIVE_POLL_INTERVAL", "60"))
+# ポーリングで見つかったファイルを並列処理するスレッド数
+DRIVE_WORKERS = max(1, int(os.getenv("DRIVE_WORKERS", "4")))
 
 # Slack リマインド設定
 SLACK_USER_MAP_JSON = os.getenv("SLACK_USER_MAP_JSON", "")  # 例: {"田中":"U0123...", "佐藤":"U0456..."}
 DEFAULT_REMIND_HOUR = int(os.getenv("DEFAULT_REMIND_HOUR", "10"))  # 期限日に何時にリマインドするか(ローカル時間)
 
+# 共有ストア設定（複数ワーカー・再起動間で下書きメタ情報などを共有する場合に設定、要 redis パッケージ）
+REDIS_URL = os.getenv("REDIS_URL", "")
+
+# タイムゾーン（JST固定）。zoneinfoがない環境ではNone（naive扱い）
+try:
+    from zoneinfo import ZoneInfo  # Python 3.9+
+    JST = ZoneInfo("Asia/Tokyo")
+except Exception:
+    JST = None
+
+# ログ設定（DEBUG / INFO / WARNING / ERROR）
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+
+# PDF設定
+# 日本語TrueTypeフォント（.ttf）のパス。設定時は使用グリフのみサブセット埋め込み、未設定時はCIDフォント（非埋め込み）を使用
+PDF_FONT_PATH = os.getenv("PDF_FONT_PATH", "")
+
 # =========================
 # 設定の検証
 # =========================
@@ -55,11 +77,27 @@ if not SLACK_BOT_TOKEN:
     raise RuntimeError("SLACK_BOT_TOKEN が未設定です。")
 if not GMAIL_USER or not GMAIL_PASS:
     print("⚠️ Gmail設定が未設定です。メール送信はスキップされます。")
+if LOG_LEVEL not in logging.getLevelNamesMapping():
+    print(f"⚠️ LOG_LEVEL の値が不正です: {LOG_LEVEL}。INFO を使用します。")
+    LOG_LEVEL = "INFO"
+
+# Slack署名検証（HMAC-SHA256）の実行環境を確認（LOG_LEVEL=DEBUG 時のみ表示）
+# hmac.digest はOpenSSLで計算され、CPUがSHA拡張命令（sha_ni）に対応していれば自動的に使用される
+if LOG_LEVEL == "DEBUG":
+    import ssl
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as f:
+            _sha_ni = " sha_ni" in f.read()
+    except OSError:
+        _sha_ni = None
+    print(f"[Config] {ssl.OPENSSL_VERSION}, sha_ni: {'不明' if _sha_ni is None else _sha_ni}")
 
 # =========================
 # クライアント初期化
 # =========================
 client_oa = OpenAI(api_key=OPENAI_API_KEY)
+# イベントループ上で待機する処理（音声アップロードのパイプライン）用の非同期クライアント
+client_oa_async = AsyncOpenAI(api_key=OPENAI_API_KEY)
 client_slack = WebClient(token=SLACK_BOT_TOKEN)
 
 # =========================
@@ -1,5 +1,4 @@
 import os
-import sys
 import json
 import uuid
 import shutil
@@ -8,6 +7,13 @@ import hmac
 import hashlib
 import re
 import asyncio
+import threading
+import logging
+import orjson
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
 from pathlib import Path
 from typing import Optional
 from datetime import datetime, timedelta
@@ -25,14 +31,24 @@ from slack_sdk.errors import SlackApiError
 
 # ---- Gmail, Drive ----
 import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from email.mime.application import MIMEApplication
+import mmap
+from email.message import EmailMessage
+from google.auth.exceptions import RefreshError
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
+from googleapiclient.http import MediaFileUpload, MediaIoBaseUpload
 from googleapiclient.errors import HttpError
 
+# ---- PDF（ReportLab） ----
+from reportlab import rl_config
+from reportlab.lib.pagesizes import A4
+from reportlab.lib import colors
+from reportlab.lib.units import mm
+from reportlab.pdfgen import canvas
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+from reportlab.pdfbase.ttfonts import TTFont
+
 # =========================
 # リファクタリングされたモジュールのインポート
 # =========================
@@ -45,14 +61,18 @@ try:
         GMAIL_USER, GMAIL_PASS,
         GOOGLE_DRIVE_FOLDER_ID, GOOGLE_SERVICE_ACCOUNT_JSON, GOOGLE_SERVICE_ACCOUNT_PATH,
         NOTTA_DRIVE_FOLDER_ID, GOOGLE_DRIVE_WATCH_ENABLED, GOOGLE_DRIVE_WEBHOOK_SECRET,
-        GOOGLE_DRIVE_POLL_INTERVAL,
-        SLACK_USER_MAP_JSON, DEFAULT_REMIND_HOUR,
+        GOOGLE_DRIVE_POLL_INTERVAL, DRIVE_WORKERS,
+        SLACK_USER_MAP_JSON, DEFAULT_REMIND_HOUR, PDF_FONT_PATH, JST,
         client_oa, client_slack,
         BASE_DIR, DATA_DIR, UPLOAD_DIR, TRANS_DIR, SUMM_DIR, PDF_DIR
     )
     from app.models import Draft
-    from app.utils.storage import save_json
-    from app.services.openai_service import transcribe_audio, summarize_to_structured
+    from app.utils.storage import save_json, write_bytes_atomic
+    from app.utils.meta_store import create_meta_store
+    from app.utils.logging_utils import get_logger
+    from app.services.openai_service import (
+        summarize_to_structured, transcribe_audio_async, summarize_to_structured_async
+    )
     from app.services.slack_service import (
         verify_slack_signature,
         build_minutes_preview_blocks,
@@ -66,6 +86,7 @@ try:
         mark_task_complete,
         update_task_block_in_slack
     )
+    from app.services.draft_service import load_draft
 except ImportError:
     # ローカル開発環境（appディレクトリから直接実行）
     from config import (
@@ -73,14 +94,18 @@ except ImportError:
         GMAIL_USER, GMAIL_PASS,
         GOOGLE_DRIVE_FOLDER_ID, GOOGLE_SERVICE_ACCOUNT_JSON, GOOGLE_SERVICE_ACCOUNT_PATH,
         NOTTA_DRIVE_FOLDER_ID, GOOGLE_DRIVE_WATCH_ENABLED, GOOGLE_DRIVE_WEBHOOK_SECRET,
-        GOOGLE_DRIVE_POLL_INTERVAL,
-        SLACK_USER_MAP_JSON, DEFAULT_REMIND_HOUR,
+        GOOGLE_DRIVE_POLL_INTERVAL, DRIVE_WORKERS,
+        SLACK_USER_MAP_JSON, DEFAULT_REMIND_HOUR, PDF_FONT_PATH, JST,
         client_oa, client_slack,
         BASE_DIR, DATA_DIR, UPLOAD_DIR, TRANS_DIR, SUMM_DIR, PDF_DIR
     )
     from models import Draft
-    from utils.storage import save_json
-    from services.openai_service import transcribe_audio, summarize_to_structured
+    from utils.storage import save_json, write_bytes_atomic
+    from utils.meta_store import create_meta_store
+    from utils.logging_utils import get_logger
+    from services.openai_service import (
+        summarize_to_structured, transcribe_audio_async, summarize_to_structured_async
+    )
     from services.slack_service import (
         verify_slack_signature,
         build_minutes_preview_blocks,
@@ -94,52 +119,131 @@ except ImportError:
         mark_task_complete,
         update_task_block_in_slack
     )
+    from services.draft_service import load_draft
+
+# ログ出力（utils/logging_utils.py のキュー経由、出力は従来のprintと同じ「[Drive] メッセージ」形式）
+# 認証情報の読み込みなどの詳細トレースはDEBUGレベルで出力（LOG_LEVEL=DEBUG で表示）
+# Google Drive処理用
+logger = get_logger("Drive")
+webhook_logger = get_logger("Drive Webhook")
+pdf_logger = get_logger("PDF")
+slack_logger = get_logger("Slack")
+gmail_logger = get_logger("Gmail")
+task_logger = get_logger("Task")
+transcript_logger = get_logger("Transcript")
 
 # =========================
 # グローバル変数（メモリ管理）
 # =========================
-DRAFT_META = {}
-# Drive Push通知チャンネル情報の保存（メモリ）
-DRIVE_WATCH_CHANNEL_INFO = {}
+# 下書きの投稿先情報（REDIS_URL 設定時はRedis、未設定時はSQLiteに保存し再起動後も保持）
+DRAFT_META = create_meta_store("draft_meta")
+# Drive Push通知チャンネル情報の保存（REDIS_URL 設定時はRedis、未設定時はSQLite）
+DRIVE_WATCH_CHANNEL_INFO = create_meta_store("drive_watch_channel")
+# このプロセスで処理済みにしたDriveファイルID（処理済みマーク失敗時の再処理防止）
+PROCESSED_FILE_IDS = set()
+# 処理中のDriveファイルID（重複通知による同時処理の防止）
+_INFLIGHT_FILE_IDS = set()
+# PROCESSED_FILE_IDS / _INFLIGHT_FILE_IDS を保護するロック
+_INFLIGHT_LOCK = threading.Lock()
 # ポーリングタスクの停止フラグ
 _polling_task = None
+# Webhook通知によるフォルダスキャン要求（起動時に生成）と、要求をまとめて実行するタスク
+_scan_requested = None
+_scan_task = None
+# 連続した通知をまとめる待ち時間（秒）
+DRIVE_SCAN_DEBOUNCE = 2.0
+# PDF生成用のプロセスプール（ReportLabの描画はCPU律速のため、GILを避けて別プロセスで実行。起動時に生成）
+_pdf_executor = None
+# アップロードファイルのコピー単位（1MiB）
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# Drive Webhookで受け付けるボディの上限（64KiB）
+WEBHOOK_MAX_BODY_BYTES = 64 * 1024
 
 app = FastAPI(title="Minutes Ingest + PDF(ReportLab) + Gmail + Drive")
 
 # =========================
 # 内部ヘルパ
 # =========================
-# 注: transcribe_audio と summarize_to_structured は services/openai_service.py からインポート済み
+# 注: transcribe_audio_async と summarize_to_structured は services/openai_service.py からインポート済み
 # 注: save_json は utils/storage.py からインポート済み
 # 注: Slack関連の関数は services/slack_service.py からインポート済み
 
 # 注: タスク関連の関数は services/task_service.py からインポート済み
 
+_HTML_ESCAPE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+
 def _escape_html(s: str) -> str:
-    return (s or "").replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    return (s or "").translate(_HTML_ESCAPE)
+
+def _register_pdf_font() -> str:
+    """
+    PDF用の日本語フォントを登録し、フォント名を返す
+    PDF_FONT_PATH 設定時はTTFontとして登録（ReportLabが使用グリフのみサブセット埋め込み）、
+    未設定または読み込み失敗時はCIDフォント（HeiseiKakuGo-W5）を使用
+    """
+    if PDF_FONT_PATH:
+        try:
+            pdfmetrics.registerFont(TTFont("MinutesJP", PDF_FONT_PATH))
+            return "MinutesJP"
+        except Exception as e:
+            pdf_logger.error(f"Failed to load font {PDF_FONT_PATH}: {e}")
+            pdf_logger.warning("Falling back to HeiseiKakuGo-W5")
+    pdfmetrics.registerFont(UnicodeCIDFont("HeiseiKakuGo-W5"))
+    return "HeiseiKakuGo-W5"
+
+# PDF用フォントはプロセス起動時に一度だけ登録
+PDF_FONT = _register_pdf_font()
+# 図形の座標範囲チェックを無効化（描画座標はすべてコード内の固定レイアウト）
+rl_config.shapeChecking = 0
+
+# 文字幅キャッシュ（(フォント名, サイズ, 文字) → 幅）。全PDFで共有し、同じ文字の再計測を避ける
+_GLYPH_WIDTHS = {}
+
+def _wrap_cjk(text: str, font_name: str, font_size: float, max_width: float) -> list:
+    """
+    文字幅ラップ（CJK向け、文字幅を1文字ずつ累積して折り返し位置を決定）
+    """
+    if not text:
+        return ["-"]
+    lines = []
+    for raw in (text or "").splitlines():
+        if raw == "":
+            lines.append("")
+            continue
+        start, acc = 0, 0.0
+        for i, ch in enumerate(raw):
+            key = (font_name, font_size, ch)
+            w = _GLYPH_WIDTHS.get(key)
+            if w is None:
+                w = _GLYPH_WIDTHS[key] = pdfmetrics.stringWidth(ch, font_name, font_size)
+            if acc + w <= max_width:
+                acc += w
+            elif i > start:
+                lines.append(raw[start:i]); start, acc = i, w
+            else:
+                lines.append(ch); start, acc = i + 1, 0.0
+        if start < len(raw):
+            lines.append(raw[start:])
+    return lines
 
 # =========================
 # PDF生成（リッチ版）: 議事録
 # =========================
-async def create_pdf_async(d: Draft, out_path: Path):
+def create_minutes_pdf(d: Draft, out_path: Path) -> bytes:
     """
     リッチレイアウト版（1カラム、メタ情報カード、セクション見出しバー、箇条書き）
+    out_path に保存し、同じPDFのバイト列を返す（メール添付・Drive保存で再読み込みしないため）
     """
-    from reportlab.lib.pagesizes import A4
-    from reportlab.lib import colors
-    from reportlab.pdfgen import canvas
-    from reportlab.pdfbase import pdfmetrics
-    from reportlab.pdfbase.cidfonts import UnicodeCIDFont
-    from reportlab.lib.units import mm
-
     # ---- ページとスタイル
     PAGE_W, PAGE_H = A4
     MARGIN_L, MARGIN_R, MARGIN_T, MARGIN_B = 20*mm, 20*mm, 18*mm, 18*mm
     TITLE_SIZE, H_SIZE, BODY_SIZE, META_SIZE, SMALL = 16, 12, 10.5, 10, 9
     LINE_GAP, PARA_GAP, SEC_GAP = 5.2*mm, 3.2*mm, 6.5*mm
 
-    pdfmetrics.registerFont(UnicodeCIDFont("HeiseiKakuGo-W5"))
-    c = canvas.Canvas(str(out_path), pagesize=A4)
+    FONT = PDF_FONT
+    # メモリ上に描画し、最後に一括でアトミック書き込み
+    pdf_buf = BytesIO()
+    c = canvas.Canvas(pdf_buf, pagesize=A4)
 
     # 共通色
     C_PRIMARY = colors.HexColor("#1f2937")   # 見出し文字
@@ -148,47 +252,23 @@ async def create_pdf_async(d: Draft, out_path: Path):
     C_MUTED   = colors.HexColor("#6b7280")   # 補助文字
     C_BAR     = colors.HexColor("#f3f4f6")   # セクション見出しバー
 
-    # 文字幅ラップ（CJK向け、既存のロジックを簡潔化）
-    def wrap_cjk(text: str, font_name: str, font_size: int, max_width: float):
-        from reportlab.pdfbase import pdfmetrics
-        if not text:
-            return ["-"]
-        lines = []
-        for raw in (text or "").splitlines():
-            if raw == "":
-                lines.append("")
-                continue
-            buf = ""
-            for ch in raw:
-                nb = buf + ch
-                if pdfmetrics.stringWidth(nb, font_name, font_size) <= max_width:
-                    buf = nb
-                else:
-                    if buf:
-                        lines.append(buf); buf = ch
-                    else:
-                        lines.append(ch); buf = ""
-            if buf or raw == "":
-                lines.append(buf)
-        return lines
-
     # 余白計算
     X0, X1 = MARGIN_L, PAGE_W - MARGIN_R
     CONTENT_W = X1 - X0
     y = PAGE_H - MARGIN_T
 
     # ヘッダ（タイトル）
-    c.setFont("HeiseiKakuGo-W5", TITLE_SIZE)
+    c.setFont(FONT, TITLE_SIZE)
     c.setFillColor(C_PRIMARY)
     c.drawString(X0, y, "議事録")
-    c.setFont("HeiseiKakuGo-W5", SMALL)
+    c.setFont(FONT, SMALL)
     c.setFillColor(C_MUTED)
     c.drawRightString(X1, y, d.datetime_str or "")
     y -= 8*mm
 
     # メタ情報カード（薄い枠＋フィールド2列）
     def meta_row(label: str, value: str, y):
-        c.setFont("HeiseiKakuGo-W5", META_SIZE)
+        c.setFont(FONT, META_SIZE)
         c.setFillColor(C_MUTED)
         c.drawString(X0+6*mm, y, f"{label}")
         c.setFillColor(colors.black)
@@ -214,7 +294,7 @@ async def create_pdf_async(d: Draft, out_path: Path):
     def new_page():
         nonlocal y
         c.showPage()
-        c.setFont("HeiseiKakuGo-W5", BODY_SIZE)
+        c.setFont(FONT, BODY_SIZE)
         y = PAGE_H - MARGIN_T
 
     # セクション見出しバー
@@ -224,80 +304,137 @@ async def create_pdf_async(d: Draft, out_path: Path):
             new_page()
         c.setFillColor(C_BAR)
         c.rect(X0, y-7*mm, CONTENT_W, 9*mm, stroke=0, fill=1)
-        c.setFont("HeiseiKakuGo-W5", H_SIZE)
+        c.setFont(FONT, H_SIZE)
         c.setFillColor(C_PRIMARY)
         c.drawString(X0+6*mm, y-5*mm, title)
         y -= 12*mm
 
-    # 箇条書き描画
-    def draw_paragraph(label: str, text: str):
+    # 箇条書き描画（折り返し済みの行を受け取る）
+    # 本文の行はページごとに1つのテキストオブジェクトへまとめ、行ごとの drawString 呼び出しを避ける
+    def begin_body_text():
+        t = c.beginText()
+        t.setFont(FONT, BODY_SIZE)
+        t.setFillColor(colors.black)
+        return t
+
+    def draw_paragraph(label: str, lines: list):
         nonlocal y
         section_bar(label)
-        c.setFont("HeiseiKakuGo-W5", BODY_SIZE)
+        c.setFont(FONT, BODY_SIZE)
         c.setFillColor(colors.black)
-        maxw = CONTENT_W - 6*mm
-        for ln in wrap_cjk(text, "HeiseiKakuGo-W5", BODY_SIZE, maxw):
+        t = begin_body_text()
+        for ln in lines:
             if y - 6*mm < MARGIN_B:
+                c.drawText(t)
                 new_page()
+                t = begin_body_text()
             # 行頭マーカー（丸）
             if ln.strip().startswith("・"):
                 marker_y = y - 1.2*mm
                 c.setFillColor(C_ACCENT)
                 c.circle(X0+4*mm, marker_y, 1.4*mm, stroke=0, fill=1)
                 c.setFillColor(colors.black)
-                c.drawString(X0+8*mm, y, ln.lstrip("・"))
+                t.setTextOrigin(X0+8*mm, y)
+                t.textOut(ln.lstrip("・"))
             else:
-                c.drawString(X0+6*mm, y, ln)
+                t.setTextOrigin(X0+6*mm, y)
+                t.textOut(ln)
             y -= 4.8*mm
+        c.drawText(t)
         y -= SEC_GAP
 
-    # 本文セクション
-    c.setFont("HeiseiKakuGo-W5", BODY_SIZE)
-    for label, val in [
-        ("サマリー", d.summary),
-        ("決定事項", d.decisions),
-        ("未決定事項", d.issues),
-        ("アクション", d.actions),
-        ("リスク", d.risks),
-    ]:
-        draw_paragraph(label, val or "-")
+    # 本文セクション（描画前に全セクションを一括で折り返し）
+    body_maxw = CONTENT_W - 6*mm
+    sections = [
+        (label, _wrap_cjk(val or "-", FONT, BODY_SIZE, body_maxw))
+        for label, val in (
+            ("サマリー", d.summary),
+            ("決定事項", d.decisions),
+            ("未決定事項", d.issues),
+            ("アクション", d.actions),
+            ("リスク", d.risks),
+        )
+    ]
+    c.setFont(FONT, BODY_SIZE)
+    for label, lines in sections:
+        draw_paragraph(label, lines)
 
     # フッター（ページ番号）
-    c.setFont("HeiseiKakuGo-W5", SMALL)
+    c.setFont(FONT, SMALL)
     c.setFillColor(C_MUTED)
     c.drawCentredString(PAGE_W/2, MARGIN_B-6*mm, "Generated by Minutes Bot")
     c.showPage()
     c.save()
+    pdf_bytes = pdf_buf.getvalue()
+    write_bytes_atomic(out_path, pdf_bytes)
+    return pdf_bytes
 
 # =========================
 # PDF生成（リッチ版）: 設計チェックリスト
 # =========================
+# 設計チェックリストの固定項目（見出し, 見出し色, 項目）
+DESIGN_CHECKLIST_SECTIONS = (
+    ("作業を始める前の準備（DoR: Definition of Ready）", "#10b981", (  # 緑
+        "要件定義書ができている",
+        "ユーザーストーリーが明確に定義されている",
+        "技術的制約が共有されている",
+        "デザインシステム／ガイドライン等設定済み",
+    )),
+    ("デザイン引き渡し（ハンドオフ）", "#f59e0b", (  # 橙
+        "画面フロー・経路図",
+        "ワイヤーフレーム（全画面）",
+        "UIコンポーネント仕様",
+        "インタラクション／アニメーション定義",
+        "レスポンシブ対応仕様",
+        "アクセシビリティ対応（WCAG AA相当）",
+    )),
+    ("作業完了の確認（DoD: Definition of Done）", "#3b82f6", (  # 青
+        "デザインレビューが完了している",
+        "関係者の最終合意が完了している",
+        "アセット（画像・アイコン）が共有されている",
+        "デザインファイルが最新版でマージ済みである",
+        "エンジニアへの巻き書き／仕様書が完了している",
+    )),
+)
+
+@lru_cache(maxsize=4)
+def _design_checklist_layout(top_y: float):
+    """
+    設計チェックリストの見出し・チェックボックスの配置を計算（固定レイアウトのため結果をキャッシュ）
+    戻り値: (((見出しy, 見出し, 色, ((項目y, 項目), ...)), ...), 最終y)
+    """
+    GAP, LINE = 5*mm, 5.2*mm
+    sections = []
+    y = top_y
+    for i, (label, color, items) in enumerate(DESIGN_CHECKLIST_SECTIONS):
+        if i:
+            y -= GAP
+        bar_y = y
+        y -= 11*mm
+        rows = []
+        for item in items:
+            rows.append((y, item))
+            y -= LINE
+        sections.append((bar_y, label, colors.HexColor(color), tuple(rows)))
+    return tuple(sections), y
+
 def create_design_checklist_pdf(out_path: Path, d: Draft):
     """
     リッチレイアウト版（カラー見出し・チェックボックス群・署名欄）
     """
-    from reportlab.lib.pagesizes import A4
-    from reportlab.lib import colors
-    from reportlab.pdfgen import canvas
-    from reportlab.pdfbase import pdfmetrics
-    from reportlab.pdfbase.cidfonts import UnicodeCIDFont
-    from reportlab.lib.units import mm
-
     PAGE_W, PAGE_H = A4
     MARGIN_L, MARGIN_R, MARGIN_T, MARGIN_B = 20*mm, 20*mm, 18*mm, 18*mm
     TITLE_SIZE, H_SIZE, BODY, SMALL = 16, 12, 10.5, 9
-    GAP, LINE = 5*mm, 5.2*mm
 
-    pdfmetrics.registerFont(UnicodeCIDFont("HeiseiKakuGo-W5"))
-    c = canvas.Canvas(str(out_path), pagesize=A4)
+    FONT = PDF_FONT
+    # メモリ上に描画し、最後に一括でアトミック書き込み
+    pdf_buf = BytesIO()
+    c = canvas.Canvas(pdf_buf, pagesize=A4)
 
     # 色
     C_TITLE   = colors.HexColor("#111827")
     C_BORDER  = colors.HexColor("#e5e7eb")
     C_MUTED   = colors.HexColor("#6b7280")
-    C_H1      = colors.HexColor("#10b981")  # 緑
-    C_H2      = colors.HexColor("#f59e0b")  # 橙
-    C_H3      = colors.HexColor("#3b82f6")  # 青
     C_BAR     = colors.HexColor("#f9fafb")
 
     def hbar(y, label, color):
@@ -306,30 +443,35 @@ def create_design_checklist_pdf(out_path: Path, d: Draft):
         c.setFillColor(color)
         c.circle(MARGIN_L+4*mm, y-2.5*mm, 2*mm, stroke=0, fill=1)
         c.setFillColor(C_TITLE)
-        c.setFont("HeiseiKakuGo-W5", H_SIZE)
+        c.setFont(FONT, H_SIZE)
         c.drawString(MARGIN_L+9*mm, y-5*mm, label)
-        return y - 11*mm
+
+    # チェックボックスの枠はForm XObjectとして一度だけ定義し、各項目では参照のみ行う
+    c.beginForm("cbx")
+    c.setStrokeColor(C_BORDER); c.setLineWidth(1)
+    c.rect(0, 0, 4*mm, 4*mm, stroke=1, fill=0)
+    c.endForm()
 
     def checkbox(y, text):
-        c.setStrokeColor(C_BORDER); c.setLineWidth(1)
-        c.rect(MARGIN_L, y-4.2*mm, 4*mm, 4*mm, stroke=1, fill=0)
-        c.setFillColor(C_TITLE)
-        c.setFont("HeiseiKakuGo-W5", BODY)
+        # 文字色・フォントは呼び出し側で設定済み
+        c.saveState()
+        c.translate(MARGIN_L, y-4.2*mm)
+        c.doForm("cbx")
+        c.restoreState()
         c.drawString(MARGIN_L+6*mm, y-1*mm, text)
-        return y - LINE
 
     # タイトル
-    c.setFont("HeiseiKakuGo-W5", TITLE_SIZE)
+    c.setFont(FONT, TITLE_SIZE)
     c.setFillColor(C_TITLE)
     c.drawString(MARGIN_L, PAGE_H - MARGIN_T, "設計チェックリスト")
-    c.setFont("HeiseiKakuGo-W5", SMALL)
+    c.setFont(FONT, SMALL)
     c.setFillColor(C_MUTED)
     c.drawRightString(PAGE_W - MARGIN_R, PAGE_H - MARGIN_T, "各フェーズで使用")
 
     y = PAGE_H - MARGIN_T - 10*mm
 
     # メタ情報
-    c.setFont("HeiseiKakuGo-W5", BODY)
+    c.setFont(FONT, BODY)
     c.setFillColor(C_TITLE)
     metas = [
         ("会議名", d.meeting_name or d.title or "（無題）"),
@@ -342,82 +484,186 @@ def create_design_checklist_pdf(out_path: Path, d: Draft):
         y -= 6*mm
     y -= 2*mm
 
-    # DoR
-    y = hbar(y, "作業を始める前の準備（DoR: Definition of Ready）", C_H1)
-    for item in [
-        "要件定義書ができている",
-        "ユーザーストーリーが明確に定義されている",
-        "技術的制約が共有されている",
-        "デザインシステム／ガイドライン等設定済み",
-    ]:
-        y = checkbox(y, item)
-
-    y -= GAP
-
-    # ハンドオフ
-    y = hbar(y, "デザイン引き渡し（ハンドオフ）", C_H2)
-    for item in [
-        "画面フロー・経路図",
-        "ワイヤーフレーム（全画面）",
-        "UIコンポーネント仕様",
-        "インタラクション／アニメーション定義",
-        "レスポンシブ対応仕様",
-        "アクセシビリティ対応（WCAG AA相当）",
-    ]:
-        y = checkbox(y, item)
-
-    y -= GAP
-
-    # DoD
-    y = hbar(y, "作業完了の確認（DoD: Definition of Done）", C_H3)
-    for item in [
-        "デザインレビューが完了している",
-        "関係者の最終合意が完了している",
-        "アセット（画像・アイコン）が共有されている",
-        "デザインファイルが最新版でマージ済みである",
-        "エンジニアへの巻き書き／仕様書が完了している",
-    ]:
-        y = checkbox(y, item)
+    # DoR / ハンドオフ / DoD（配置は固定のため計算済みの座標で描画）
+    sections, y = _design_checklist_layout(y)
+    for bar_y, label, color, rows in sections:
+        hbar(bar_y, label, color)
+        # チェックボックス群の描画状態はセクションごとに一度だけ設定
+        c.setFillColor(C_TITLE)
+        c.setFont(FONT, BODY)
+        for item_y, item in rows:
+            checkbox(item_y, item)
 
     # 署名欄
     y -= 8*mm
     c.setFillColor(C_TITLE)
-    c.setFont("HeiseiKakuGo-W5", BODY)
+    c.setFont(FONT, BODY)
     labels = ["デザイナー", "エンジニア", "PM", "確認日"]
     col_w = (PAGE_W - MARGIN_L - MARGIN_R) / 2
+    c.setStrokeColor(C_BORDER); c.setLineWidth(0.8)
     for i, lab in enumerate(labels):
         x = MARGIN_L + (i%2)*col_w
         c.drawString(x, y, f"{lab}")
-        c.setStrokeColor(C_BORDER); c.setLineWidth(0.8)
         c.line(x, y-3*mm, x + col_w - 10*mm, y-3*mm)
         if i%2==1: y -= 10*mm
 
     # フッター
-    c.setFont("HeiseiKakuGo-W5", SMALL)
+    c.setFont(FONT, SMALL)
     c.setFillColor(C_MUTED)
     c.drawString(MARGIN_L, MARGIN_B-6*mm, "このチェックリストは設計移管者と各関係者で確認するためのツールです。")
     c.showPage()
     c.save()
+    write_bytes_atomic(out_path, pdf_buf.getvalue())
 
 # --- Gmail送信 ---
-def send_via_gmail(sender, password, to, subject, body, attach_path: Path):
-    msg = MIMEMultipart()
+class _GmailSession:
+    """
+    ログイン済みのSMTP接続を保持し、送信ごとのTLSハンドシェイク・認証を省略する
+    """
+    def __init__(self, sender: str, password: str):
+        self.sender = sender
+        self.password = password
+        self._smtp = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        smtp = smtplib.SMTP_SSL("smtp.gmail.com", 465)
+        smtp.login(self.sender, self.password)
+        self._smtp = smtp
+
+    def _is_alive(self) -> bool:
+        try:
+            return self._smtp.noop()[0] == 250
+        except smtplib.SMTPException:
+            return False
+
+    def send(self, msg):
+        with self._lock:
+            if self._smtp is None or not self._is_alive():
+                self.close_unlocked()
+                self._connect()
+            try:
+                self._smtp.send_message(msg)
+            except smtplib.SMTPServerDisconnected:
+                # アイドル中にサーバー側で切断された場合は再接続して1回だけ再送
+                self._connect()
+                self._smtp.send_message(msg)
+
+    def close_unlocked(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except Exception:
+                pass
+            self._smtp = None
+
+    def close(self):
+        with self._lock:
+            self.close_unlocked()
+
+_gmail_sessions = {}
+_gmail_sessions_lock = threading.Lock()
+
+def gmail_session(sender, password) -> _GmailSession:
+    """送信元アカウントごとのSMTPセッションを取得（初回のみ生成）"""
+    with _gmail_sessions_lock:
+        session = _gmail_sessions.get(sender)
+        if session is None or session.password != password:
+            session = _gmail_sessions[sender] = _GmailSession(sender, password)
+        return session
+
+def close_gmail_sessions():
+    """保持しているSMTPセッションをすべて切断"""
+    with _gmail_sessions_lock:
+        sessions = list(_gmail_sessions.values())
+        _gmail_sessions.clear()
+    for session in sessions:
+        session.close()
+
+def send_via_gmail(sender, password, to, subject, body, attach_path: Path, attach_data: Optional[bytes] = None):
+    """
+    attach_data: 生成済みPDFのバイト列（指定時はファイルを読み込まずに添付）
+    """
+    msg = EmailMessage()
     msg["From"], msg["To"], msg["Subject"] = sender, to, subject
-    msg.attach(MIMEText(body, "plain", "utf-8"))
+    msg.set_content(body, charset="utf-8")
+    if attach_data is not None:
+        msg.add_attachment(attach_data, maintype="application", subtype="pdf", filename=attach_path.name)
+        gmail_session(sender, password).send(msg)
+        return
+    # 添付ファイルはmmap経由で渡し、生バイト列をメモリに複製せずにbase64エンコードする
     with open(attach_path, "rb") as f:
-        part = MIMEApplication(f.read(), Name=attach_path.name)
-        part["Content-Disposition"] = f'attachment; filename="{attach_path.name}"'
-        msg.attach(part)
-    with smtplib.SMTP_SSL("smtp.gmail.com", 465) as s:
-        s.login(sender, password)
-        s.send_message(msg)
+        if os.fstat(f.fileno()).st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                view = memoryview(mm)
+                try:
+                    msg.add_attachment(view, maintype="application", subtype="pdf", filename=attach_path.name)
+                finally:
+                    view.release()
+        else:
+            msg.add_attachment(b"", maintype="application", subtype="pdf", filename=attach_path.name)
+    gmail_session(sender, password).send(msg)
 
 # --- Google Drive API共通関数 ---
+# スレッドごとのDriveクライアントキャッシュ（httplib2はスレッドセーフでないため、スレッド単位で再利用）
+_drive_local = threading.local()
+# reset_drive_service() のたびに進める世代番号（各スレッドは世代が変わっていればキャッシュを作り直す）
+_drive_generation = 0
+_drive_generation_lock = threading.Lock()
+
 def get_drive_service(scope: str = "drive.file"):
     """
-    Google Drive APIクライアントを取得（サービスアカウント認証）
+    Google Drive APIクライアントを取得（スコープ・スレッドごとにキャッシュ）
     scope: "drive.file" (作成したファイルのみ) または "drive.readonly" (読み取り専用) または "drive" (読み書き)
     """
+    services = getattr(_drive_local, "services", None)
+    if services is None or _drive_local.generation != _drive_generation:
+        services = _drive_local.services = {}
+        _drive_local.generation = _drive_generation
+    service = services.get(scope)
+    if service is None:
+        service = services[scope] = _build_drive_service(scope)
+    return service
+
+def reset_drive_service() -> None:
+    """
+    キャッシュ済みのDriveクライアントと認証情報を破棄（トークン更新失敗時に次回呼び出しで作り直す）
+    世代番号を進めるため、他のスレッドがキャッシュしているクライアントも次回呼び出し時に作り直される
+    """
+    global _drive_generation
+    with _drive_generation_lock:
+        _get_drive_credentials.cache_clear()
+        _drive_generation += 1
+
+def _parse_service_account_info():
+    """
+    サービスアカウント情報（JSON文字列またはファイル）をインポート時に一度だけ読み込む
+    戻り値: (情報dict または None, 読み込みエラー または None)
+    """
+    try:
+        if GOOGLE_SERVICE_ACCOUNT_JSON:
+            return json.loads(GOOGLE_SERVICE_ACCOUNT_JSON), None
+        if GOOGLE_SERVICE_ACCOUNT_PATH and os.path.exists(GOOGLE_SERVICE_ACCOUNT_PATH):
+            with open(GOOGLE_SERVICE_ACCOUNT_PATH, 'r', encoding='utf-8') as f:
+                return json.load(f), None
+    except json.JSONDecodeError as e:
+        logger.error(f"Failed to parse service account JSON: {e}")
+        return None, e
+    except OSError as e:
+        logger.error(f"Failed to read service account file: {e}")
+        return None, e
+    return None, None
+
+_SA_INFO, _SA_INFO_ERROR = _parse_service_account_info()
+# エラーメッセージ表示用のサービスアカウントのメールアドレス
+_SA_EMAIL = (_SA_INFO or {}).get("client_email") or "unknown"
+
+@lru_cache(maxsize=4)
+def _get_drive_credentials(scope: str):
+    """
+    サービスアカウント認証情報をスコープごとに一度だけ生成
+    （Credentialsはトークンを内部で更新するため、スレッド間で共有して問題ない）
+    """
     if scope == "drive.file":
         SCOPES = ["https://www.googleapis.com/auth/drive.file"]
     elif scope == "drive.readonly":
@@ -425,155 +671,147 @@ def get_drive_service(scope: str = "drive.file"):
     else:
         SCOPES = ["https://www.googleapis.com/auth/drive"]
     
+    logger.debug("Initializing service account credentials...")
+    
+    # 方法1: 環境変数からJSONを読み込む（推奨）
+    if GOOGLE_SERVICE_ACCOUNT_JSON:
+        logger.debug("Using credentials from GOOGLE_SERVICE_ACCOUNT_JSON environment variable")
+        if _SA_INFO_ERROR is not None:
+            raise ValueError(f"Invalid JSON in GOOGLE_SERVICE_ACCOUNT_JSON: {_SA_INFO_ERROR}")
+        creds = service_account.Credentials.from_service_account_info(
+            _SA_INFO,
+            scopes=SCOPES
+        )
+        logger.debug("Service account credentials loaded from JSON string")
+        logger.debug("Service account email: %s", _SA_EMAIL)
+    # 方法2: ファイルパスから読み込む
+    elif GOOGLE_SERVICE_ACCOUNT_PATH:
+        logger.debug("Using credentials from file: %s", GOOGLE_SERVICE_ACCOUNT_PATH)
+        if not os.path.exists(GOOGLE_SERVICE_ACCOUNT_PATH):
+            raise FileNotFoundError(f"Service account file not found: {GOOGLE_SERVICE_ACCOUNT_PATH}")
+        creds = service_account.Credentials.from_service_account_file(
+            GOOGLE_SERVICE_ACCOUNT_PATH,
+            scopes=SCOPES
+        )
+        logger.debug("Service account credentials loaded from file")
+    else:
+        raise RuntimeError("GOOGLE_SERVICE_ACCOUNT_JSON or GOOGLE_SERVICE_ACCOUNT_PATH must be set")
+    return creds
+
+def _build_drive_service(scope: str):
+    """
+    Google Drive APIクライアントを生成（サービスアカウント認証）
+    """
     try:
-        print("[Drive] Initializing service account credentials...")
-        sys.stdout.flush()
-        
-        # 方法1: 環境変数からJSONを読み込む（推奨）
-        if GOOGLE_SERVICE_ACCOUNT_JSON:
-            print("[Drive] Using credentials from GOOGLE_SERVICE_ACCOUNT_JSON environment variable")
-            sys.stdout.flush()
-            try:
-                service_account_info = json.loads(GOOGLE_SERVICE_ACCOUNT_JSON)
-                creds = service_account.Credentials.from_service_account_info(
-                    service_account_info,
-                    scopes=SCOPES
-                )
-                service_account_email = service_account_info.get("client_email", "unknown")
-                print(f"[Drive] Service account credentials loaded from JSON string")
-                print(f"[Drive] Service account email: {service_account_email}")
-                sys.stdout.flush()
-            except json.JSONDecodeError as e:
-                print(f"[Drive] Failed to parse GOOGLE_SERVICE_ACCOUNT_JSON: {e}")
-                sys.stdout.flush()
-                raise ValueError(f"Invalid JSON in GOOGLE_SERVICE_ACCOUNT_JSON: {e}")
-        # 方法2: ファイルパスから読み込む
-        elif GOOGLE_SERVICE_ACCOUNT_PATH:
-            print(f"[Drive] Using credentials from file: {GOOGLE_SERVICE_ACCOUNT_PATH}")
-            sys.stdout.flush()
-            if not os.path.exists(GOOGLE_SERVICE_ACCOUNT_PATH):
-                raise FileNotFoundError(f"Service account file not found: {GOOGLE_SERVICE_ACCOUNT_PATH}")
-            creds = service_account.Credentials.from_service_account_file(
-                GOOGLE_SERVICE_ACCOUNT_PATH,
-                scopes=SCOPES
-            )
-            print("[Drive] Service account credentials loaded from file")
-            sys.stdout.flush()
-        else:
-            raise RuntimeError("GOOGLE_SERVICE_ACCOUNT_JSON or GOOGLE_SERVICE_ACCOUNT_PATH must be set")
+        creds = _get_drive_credentials(scope)
         
-        print("[Drive] Building Drive service...")
-        sys.stdout.flush()
-        service = build("drive", "v3", credentials=creds)
-        print("[Drive] Drive service initialized successfully")
-        sys.stdout.flush()
+        logger.debug("Building Drive service...")
+        # 同梱のディスカバリー文書を使い、ファイルキャッシュ（とそのロック）を経由しない
+        service = build("drive", "v3", credentials=creds, cache_discovery=False, static_discovery=True)
+        logger.debug("Drive service initialized successfully")
         return service
     except Exception as e:
-        print(f"[Drive] Failed to initialize Drive service: {e}")
-        sys.stdout.flush()
+        logger.error(f"Failed to initialize Drive service: {e}")
         raise
         
+# レジューム可能アップロードのチャンクサイズと、チャンクごとの再試行回数
+DRIVE_UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+DRIVE_UPLOAD_RETRIES = 5
+
+def _create_drive_file(service, meta: dict, file_path: Path, data: Optional[bytes] = None) -> dict:
+    """
+    PDFをレジューム可能アップロードで作成（data 指定時はファイルを読まずにメモリ上のバイト列を送信）
+    一時的なエラー（5xx/429）はチャンク単位で指数バックオフ再試行し、送信済みの部分は再送しない
+    """
+    if data is not None:
+        media = MediaIoBaseUpload(BytesIO(data), mimetype="application/pdf", resumable=True, chunksize=DRIVE_UPLOAD_CHUNK_SIZE)
+    else:
+        media = MediaFileUpload(str(file_path), mimetype="application/pdf", resumable=True, chunksize=DRIVE_UPLOAD_CHUNK_SIZE)
+    request = service.files().create(
+        body=meta,
+        media_body=media,
+        fields="id, webViewLink",
+        supportsAllDrives=True
+    )
+    response = None
+    while response is None:
+        status, response = request.next_chunk(num_retries=DRIVE_UPLOAD_RETRIES)
+    return response
+
 # --- Google Drive保存（リンク返却 & 共有ドライブ対応） ---
-def upload_to_drive(file_path: Path):
+def upload_to_drive(file_path: Path, data: Optional[bytes] = None):
+    """
+    data: 生成済みPDFのバイト列（指定時はファイルを読み込まずにアップロード）
+    """
     # 共有フォルダにアクセスするため、"drive"スコープ（フルアクセス）を使用
     service = get_drive_service("drive")
     try:
-        # サービスアカウントのメールアドレスを取得
-        if GOOGLE_SERVICE_ACCOUNT_JSON:
-            try:
-                service_account_info = json.loads(GOOGLE_SERVICE_ACCOUNT_JSON)
-                service_account_email = service_account_info.get("client_email", "unknown")
-            except:
-                service_account_email = "unknown"
-        else:
-            service_account_email = "unknown"
+        # サービスアカウントのメールアドレス（インポート時に取得済み）
+        service_account_email = _SA_EMAIL
         
         meta = {"name": file_path.name}
         folder_accessible = False
         
         if GOOGLE_DRIVE_FOLDER_ID:
-            print(f"[Drive] Checking folder access: {GOOGLE_DRIVE_FOLDER_ID}")
-            sys.stdout.flush()
+            logger.info(f"Checking folder access: {GOOGLE_DRIVE_FOLDER_ID}")
             
             # フォルダが存在するか確認
             try:
-                folder = service.files().get(fileId=GOOGLE_DRIVE_FOLDER_ID, supportsAllDrives=True, fields="id, name, mimeType").execute()
-                print(f"[Drive] Folder found: {folder.get('name', 'unknown')} (ID: {folder.get('id')}, Type: {folder.get('mimeType')})")
-                sys.stdout.flush()
+                # 存在確認のみのためIDだけを取得
+                folder = service.files().get(fileId=GOOGLE_DRIVE_FOLDER_ID, supportsAllDrives=True, fields="id").execute()
+                logger.info(f"Folder found: {folder.get('id')}")
                 folder_accessible = True
                 meta["parents"] = [GOOGLE_DRIVE_FOLDER_ID]
             except HttpError as folder_error:
                 if folder_error.resp.status == 404:
-                    print(f"[Drive] ERROR: Folder not found or service account doesn't have access")
-                    print(f"[Drive] Folder ID: {GOOGLE_DRIVE_FOLDER_ID}")
-                    print(f"[Drive] Service account email: {service_account_email}")
-                    print(f"[Drive] Please share the folder with the service account email above")
-                    print(f"[Drive] Falling back to root folder upload...")
-                    sys.stdout.flush()
+                    logger.error("ERROR: Folder not found or service account doesn't have access")
+                    logger.info(f"Folder ID: {GOOGLE_DRIVE_FOLDER_ID}")
+                    logger.info(f"Service account email: {service_account_email}")
+                    logger.info("Please share the folder with the service account email above")
+                    logger.info("Falling back to root folder upload...")
                     # フォルダが見つからない場合は、ルートフォルダにアップロード
                     folder_accessible = False
                 else:
-                    print(f"[Drive] Error checking folder: {folder_error}")
-                    sys.stdout.flush()
+                    logger.error(f"Error checking folder: {folder_error}")
                     raise
         else:
-            print("[Drive] Uploading to root folder (no folder ID specified)")
-            sys.stdout.flush()
+            logger.info("Uploading to root folder (no folder ID specified)")
         
         if folder_accessible:
-            print(f"[Drive] Uploading to folder: {GOOGLE_DRIVE_FOLDER_ID}")
+            logger.info(f"Uploading to folder: {GOOGLE_DRIVE_FOLDER_ID}")
         else:
-            print("[Drive] Uploading to root folder")
+            logger.info("Uploading to root folder")
             # ルートフォルダにアップロードする場合はparentsを指定しない
             if "parents" in meta:
                 del meta["parents"]
-        sys.stdout.flush()
         
-        print(f"[Drive] Creating file in Drive...")
-        sys.stdout.flush()
+        logger.info("Creating file in Drive...")
         
         try:
-            media = MediaFileUpload(str(file_path), mimetype="application/pdf")
-            f = service.files().create(
-                body=meta,
-                media_body=media,
-                fields="id, webViewLink",
-                supportsAllDrives=True
-            ).execute()
-            print(f"[Drive] Upload successful: {f}")
-            print(f"[Drive] File ID: {f.get('id')}")
-            print(f"[Drive] File URL: {f.get('webViewLink')}")
-            sys.stdout.flush()
+            f = _create_drive_file(service, meta, file_path, data)
+            logger.info(f"Upload successful: {f}")
+            logger.info(f"File ID: {f.get('id')}")
+            logger.info(f"File URL: {f.get('webViewLink')}")
             return f  # {"id": "...", "webViewLink": "..."}
         except HttpError as create_error:
             # 404エラーで、フォルダIDが指定されている場合は、ルートフォルダに再試行
             if create_error.resp.status == 404 and GOOGLE_DRIVE_FOLDER_ID and folder_accessible:
-                print(f"[Drive] Upload to folder failed (404), trying root folder...")
-                sys.stdout.flush()
-                # ルートフォルダにアップロード（MediaFileUploadを再作成）
+                logger.warning("Upload to folder failed (404), trying root folder...")
+                # ルートフォルダにアップロード（アップロード用メディアを再作成）
                 meta_no_parents = {"name": file_path.name}
-                media = MediaFileUpload(str(file_path), mimetype="application/pdf")
-                f = service.files().create(
-                    body=meta_no_parents,
-                    media_body=media,
-                    fields="id, webViewLink",
-                    supportsAllDrives=True
-                ).execute()
-                print(f"[Drive] Upload to root folder successful: {f}")
-                print(f"[Drive] File ID: {f.get('id')}")
-                print(f"[Drive] File URL: {f.get('webViewLink')}")
-                sys.stdout.flush()
+                f = _create_drive_file(service, meta_no_parents, file_path, data)
+                logger.info(f"Upload to root folder successful: {f}")
+                logger.info(f"File ID: {f.get('id')}")
+                logger.info(f"File URL: {f.get('webViewLink')}")
                 return f
             else:
                 raise
     except HttpError as e:
         if e.resp.status == 404:
-            print(f"[Drive] Upload failed: Folder not found or access denied")
-            print(f"[Drive] Please share the folder '{GOOGLE_DRIVE_FOLDER_ID}' with the service account email: {service_account_email}")
-            print(f"[Drive] Service account email: {service_account_email}")
-            sys.stdout.flush()
-        print(f"[Drive] Upload failed: {e}")
-        sys.stdout.flush()
+            logger.error("Upload failed: Folder not found or access denied")
+            logger.info(f"Please share the folder '{GOOGLE_DRIVE_FOLDER_ID}' with the service account email: {service_account_email}")
+            logger.info(f"Service account email: {service_account_email}")
+        logger.error(f"Upload failed: {e}")
         raise
 
 # --- Google Driveからのファイル取得機能 ---
@@ -585,93 +823,178 @@ def get_file_metadata(file_id: str) -> dict:
     try:
         file = service.files().get(
             fileId=file_id,
-            fields="id, name, createdTime, modifiedTime, mimeType, size, parents",
+            fields="id, name, createdTime, mimeType, size, appProperties",
             supportsAllDrives=True
         ).execute()
-        print(f"[Drive] File metadata retrieved: {file.get('name')}")
+        logger.info(f"File metadata retrieved: {file.get('name')}")
         return file
     except HttpError as e:
         error_details = e.error_details if hasattr(e, 'error_details') else str(e)
         if e.resp.status == 404:
-            print(f"[Drive] File not found: {file_id}")
-            print(f"[Drive] サービスアカウントにファイルへのアクセス権限がない可能性があります。")
-            # サービスアカウントのメールアドレスを取得して表示
-            try:
-                if GOOGLE_SERVICE_ACCOUNT_JSON:
-                    service_account_info = json.loads(GOOGLE_SERVICE_ACCOUNT_JSON)
-                    service_account_email = service_account_info.get("client_email", "")
-                    print(f"[Drive] ファイルをサービスアカウント ({service_account_email}) に共有してください。")
-                elif GOOGLE_SERVICE_ACCOUNT_PATH and os.path.exists(GOOGLE_SERVICE_ACCOUNT_PATH):
-                    with open(GOOGLE_SERVICE_ACCOUNT_PATH, 'r', encoding='utf-8') as f:
-                        service_account_info = json.load(f)
-                        service_account_email = service_account_info.get("client_email", "")
-                        print(f"[Drive] ファイルをサービスアカウント ({service_account_email}) に共有してください。")
-                else:
-                    print(f"[Drive] ファイルをサービスアカウントに共有してください。")
-            except Exception:
-                print(f"[Drive] ファイルをサービスアカウントに共有してください。")
+            logger.error(f"File not found: {file_id}")
+            logger.info("サービスアカウントにファイルへのアクセス権限がない可能性があります。")
+            # サービスアカウントのメールアドレスを表示（インポート時に取得済み）
+            if _SA_EMAIL != "unknown":
+                logger.info(f"ファイルをサービスアカウント ({_SA_EMAIL}) に共有してください。")
+            else:
+                logger.info("ファイルをサービスアカウントに共有してください。")
         else:
-            print(f"[Drive] Failed to get file metadata: {e}")
-            print(f"[Drive] Error details: {error_details}")
+            logger.error(f"Failed to get file metadata: {e}")
+            logger.error(f"Error details: {error_details}")
         raise
 
-def download_text_from_drive(file_id: str) -> str:
+# 一括取得するファイルサイズの上限（これを超える場合は分割ダウンロード）
+DRIVE_DIRECT_DOWNLOAD_MAX = 10 * 1024 * 1024
+# 分割ダウンロード時のチャンクサイズ
+DRIVE_DOWNLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+def download_text_from_drive(file_id: str, size: Optional[int] = None, dest_path: Optional[Path] = None) -> str:
     """
     Google Driveからテキストファイルの内容をダウンロード
+    size: メタデータで取得済みのファイルサイズ（上限以下なら1リクエストで取得）
+    dest_path: 指定時はダウンロード内容をチャンク単位で直接このファイルへ書き込む
+              （メモリ上に全体を溜めず、文字起こしテキストの保存を兼ねる）
     """
     service = get_drive_service("drive.readonly")
     try:
         # テキストファイルの内容を取得
+        # （googleapiclientが Accept-Encoding: gzip とUser-Agentの「(gzip)」を付与済みのため、
+        #   レスポンスはgzip圧縮で転送され、httplib2が透過的に展開する）
         request = service.files().get_media(fileId=file_id)
-        from io import BytesIO
-        from googleapiclient.http import MediaIoBaseDownload
-        
-        fh = BytesIO()
-        downloader = MediaIoBaseDownload(fh, request)
-        done = False
-        while done is False:
-            status, done = downloader.next_chunk()
+        direct = size is not None and size <= DRIVE_DIRECT_DOWNLOAD_MAX
+        if dest_path is not None:
+            tmp_path = dest_path.with_suffix(dest_path.suffix + ".tmp")
+            with open(tmp_path, "wb") as fh:
+                if direct:
+                    fh.write(request.execute())
+                else:
+                    from googleapiclient.http import MediaIoBaseDownload
+                    
+                    downloader = MediaIoBaseDownload(fh, request, chunksize=DRIVE_DOWNLOAD_CHUNK_SIZE)
+                    done = False
+                    while done is False:
+                        status, done = downloader.next_chunk()
+            os.replace(tmp_path, dest_path)
+            content = dest_path.read_text(encoding="utf-8")
+        else:
+            if direct:
+                data = request.execute()
+            else:
+                from googleapiclient.http import MediaIoBaseDownload
+                
+                fh = BytesIO()
+                downloader = MediaIoBaseDownload(fh, request, chunksize=DRIVE_DOWNLOAD_CHUNK_SIZE)
+                done = False
+                while done is False:
+                    status, done = downloader.next_chunk()
+                data = fh.getvalue()
+            content = data.decode('utf-8')
         
-        fh.seek(0)
-        content = fh.read().decode('utf-8')
-        print(f"[Drive] Text file downloaded: {len(content)} characters")
+        logger.info(f"Text file downloaded: {len(content)} characters")
         return content
     except HttpError as e:
-        print(f"[Drive] Failed to download text file: {e}")
+        logger.error(f"Failed to download text file: {e}")
         raise
 
-def is_file_processed(file_name: str) -> bool:
+# 旧方式で処理済みファイルに付与していたファイル名プレフィックス（既存ファイルの判定用）
+PROCESSED_PREFIX = "_processed_"
+# 処理済みマークとして付与するappProperties（ファイル名を変更せずサーバー側で検索可能）
+PROCESSED_APP_PROPERTIES = {"processed": "1"}
+# files().list で未処理ファイルのみを取得するための検索条件（旧方式のリネーム済みファイルも除外）
+UNPROCESSED_QUERY = (
+    "not appProperties has { key='processed' and value='1' }"
+    f" and not name contains '{PROCESSED_PREFIX}'"
+)
+
+def _remember_processed(file_ids) -> None:
+    """このプロセスで処理済みにしたファイルIDを記録"""
+    with _INFLIGHT_LOCK:
+        PROCESSED_FILE_IDS.update(file_ids)
+
+def _is_processed_or_inflight(file_id: str) -> bool:
+    """このプロセスで処理済み、または処理中のファイルIDか判定（Driveへの問い合わせなし）"""
+    with _INFLIGHT_LOCK:
+        return file_id in PROCESSED_FILE_IDS or file_id in _INFLIGHT_FILE_IDS
+
+def is_file_processed(file_meta: dict) -> bool:
     """
-    ファイル名から処理済みかどうかを判定
-    「_processed_」プレフィックスが含まれている場合は処理済みと判定
+    メタデータから処理済みかどうかを判定
+    appProperties の processed=1、または旧方式の「_processed_」プレフィックス付きファイル名の場合は処理済みと判定
     """
-    if not file_name:
+    if not file_meta:
         return False
-    return file_name.startswith("_processed_")
+    if (file_meta.get("appProperties") or {}).get("processed") == "1":
+        return True
+    return file_meta.get("name", "").startswith(PROCESSED_PREFIX)
 
 def mark_file_as_processed(file_id: str, original_name: str) -> bool:
     """
-    ファイル名に「_processed_」プレフィックスを追加して処理済みをマーク
+    appProperties に processed=1 を設定して処理済みをマーク（ファイル名は変更しない）
     """
-    if is_file_processed(original_name):
-        print(f"[Drive] File already processed: {original_name}")
-        return True
-    
-    new_name = f"_processed_{original_name}"
+    _remember_processed((file_id,))
     service = get_drive_service("drive")
     try:
-        file = service.files().update(
+        service.files().update(
             fileId=file_id,
-            body={"name": new_name},
-            fields="id, name",
+            body={"appProperties": PROCESSED_APP_PROPERTIES},
+            fields="id",
             supportsAllDrives=True
         ).execute()
-        print(f"[Drive] File renamed to: {file.get('name')}")
+        logger.info(f"File marked as processed: {original_name}")
         return True
     except HttpError as e:
-        print(f"[Drive] Failed to rename file: {e}")
+        logger.error(f"Failed to mark file as processed: {e}")
         return False
 
+# ポーリングで見つかったファイルの処理用スレッドプール
+# （Driveクライアントは get_drive_service でスレッドごとに生成されるため、並列実行しても共有されない）
+_drive_executor = ThreadPoolExecutor(max_workers=DRIVE_WORKERS, thread_name_prefix="drive")
+
+# フォルダのスキャン（一覧取得・処理の振り分け）用の専用スレッド（ポーリング・Webhookからのスキャンを1本ずつ実行）
+_poll_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="drive-poll")
+
+# Driveのバッチリクエスト1回あたりの最大呼び出し数
+DRIVE_BATCH_LIMIT = 100
+
+def mark_files_as_processed(files: list) -> int:
+    """
+    複数ファイルの処理済みマークをDriveのバッチリクエストでまとめて実行
+    files: [(file_id, original_name), ...]
+    戻り値: マークに成功した件数
+    """
+    if not files:
+        return 0
+    names = dict(files)
+    _remember_processed(names)
+    marked = []
+    
+    def _on_marked(request_id, response, exception):
+        if exception is not None:
+            logger.error(f"Failed to mark file as processed {request_id}: {exception}")
+        else:
+            marked.append(request_id)
+            logger.info(f"File marked as processed: {names.get(request_id, request_id)}")
+    
+    service = get_drive_service("drive")
+    file_ids = list(names)
+    for i in range(0, len(file_ids), DRIVE_BATCH_LIMIT):
+        batch = service.new_batch_http_request(callback=_on_marked)
+        for file_id in file_ids[i:i + DRIVE_BATCH_LIMIT]:
+            batch.add(
+                service.files().update(
+                    fileId=file_id,
+                    body={"appProperties": PROCESSED_APP_PROPERTIES},
+                    fields="id",
+                    supportsAllDrives=True
+                ),
+                request_id=file_id
+            )
+        try:
+            batch.execute()
+        except HttpError as e:
+            logger.error(f"Failed to execute mark batch: {e}")
+    return len(marked)
+
 # --- Google Drive Push Notifications（Webhook）機能 ---
 def watch_drive_folder(folder_id: str) -> dict:
     """
@@ -722,15 +1045,15 @@ def watch_drive_folder(folder_id: str) -> dict:
         
         DRIVE_WATCH_CHANNEL_INFO[folder_id] = channel_info
         
-        print(f"[Drive] Watch channel started for folder: {folder_id}")
-        print(f"[Drive] Channel ID: {channel_info['id']}")
-        print(f"[Drive] Resource ID: {channel_info['resourceId']}")
-        print(f"[Drive] Expiration: {channel_info['expiration']}")
-        print(f"[Drive] Webhook URL: {webhook_url}")
+        logger.info(f"Watch channel started for folder: {folder_id}")
+        logger.info(f"Channel ID: {channel_info['id']}")
+        logger.info(f"Resource ID: {channel_info['resourceId']}")
+        logger.info(f"Expiration: {channel_info['expiration']}")
+        logger.info(f"Webhook URL: {webhook_url}")
         
         return channel_info
     except HttpError as e:
-        print(f"[Drive] Failed to start watch channel: {e}")
+        logger.error(f"Failed to start watch channel: {e}")
         raise
 
 def stop_watch_drive_folder(channel_id: str, resource_id: str) -> bool:
@@ -747,54 +1070,74 @@ def stop_watch_drive_folder(channel_id: str, resource_id: str) -> bool:
             }
         ).execute()
         
-        print(f"[Drive] Watch channel stopped: {channel_id}")
+        logger.info(f"Watch channel stopped: {channel_id}")
         return True
     except HttpError as e:
-        print(f"[Drive] Failed to stop watch channel: {e}")
+        logger.error(f"Failed to stop watch channel: {e}")
         return False
 
-def process_drive_file_notification(file_id: str, channel_id: str = None):
+def process_drive_file_notification(file_id: str, channel_id: str = None, file_meta: Optional[dict] = None, mark_processed: bool = True) -> bool:
     """
     Google Driveからの通知でファイルを処理（バックグラウンドタスク）
+    file_meta: files().list 等で取得済みのメタデータ（指定時は files().get を省略）
+    mark_processed: Falseの場合は処理済みマークを呼び出し側に任せる
+    戻り値: ファイルを処理した場合True
     """
+    # Webhookとポーリングで同じファイルが重複して届いても、処理は1回だけ行う
+    with _INFLIGHT_LOCK:
+        if file_id in _INFLIGHT_FILE_IDS or file_id in PROCESSED_FILE_IDS:
+            logger.info(f"File already processing or processed: {file_id}")
+            return False
+        _INFLIGHT_FILE_IDS.add(file_id)
     try:
-        # ファイルメタデータを取得
-        file_meta = get_file_metadata(file_id)
+        # ファイルメタデータを取得（一覧取得済みならAPI呼び出しを省略）
+        if file_meta is None:
+            file_meta = get_file_metadata(file_id)
         file_name = file_meta.get("name", "")
         
         # 既に処理済みか確認
-        if is_file_processed(file_name):
-            print(f"[Drive] File already processed: {file_name}")
-            return
+        if is_file_processed(file_meta):
+            logger.info(f"File already processed: {file_name}")
+            return False
         
         # テキストファイルか確認
         mime_type = file_meta.get("mimeType", "")
         if mime_type not in ["text/plain", "text/plain; charset=utf-8"]:
-            print(f"[Drive] Not a text file: {mime_type}")
-            return
+            logger.info(f"Not a text file: {mime_type}")
+            return False
         
-        # テキストファイルをダウンロード
-        text_content = download_text_from_drive(file_id)
+        # テキストファイルを文字起こし保存先へ直接ダウンロード
+        draft_id = str(uuid.uuid4())
+        size = file_meta.get("size")
+        text_content = download_text_from_drive(
+            file_id, int(size) if size else None, dest_path=TRANS_DIR / f"{draft_id}.txt"
+        )
         
         # ファイル名からタイトルを生成
-        title = file_name.replace(".txt", "").replace("_processed_", "")
+        title = file_name.replace(".txt", "").replace(PROCESSED_PREFIX, "")
         
         # 作成日時を取得
         created_time = file_meta.get("createdTime", "")
         datetime_str = created_time if created_time else datetime.now().isoformat()
         
-        # テキスト処理パイプラインを実行
-        draft_id = str(uuid.uuid4())
-        process_text_pipeline(draft_id, text_content, title, DEFAULT_SLACK_CHANNEL, datetime_str)
+        # テキスト処理パイプラインを実行（文字起こしはダウンロード時に保存済み）
+        process_text_pipeline(draft_id, text_content, title, DEFAULT_SLACK_CHANNEL, datetime_str, transcript_saved=True)
         
-        # ファイルを処理済みにマーク
-        mark_file_as_processed(file_id, file_name)
+        # ファイルを処理済みにマーク（Driveへのマークが後回しでも、このプロセスでは即座に処理済み扱い）
+        _remember_processed((file_id,))
+        if mark_processed:
+            mark_file_as_processed(file_id, file_name)
         
-        print(f"[Drive] File processed successfully: {file_name}")
+        logger.info(f"File processed successfully: {file_name}")
+        return True
     except Exception as e:
-        print(f"[Drive] Error processing file notification: {e}")
+        logger.error(f"Error processing file notification: {e}")
         import traceback
-        print(f"[Drive] Traceback: {traceback.format_exc()}")
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        return False
+    finally:
+        with _INFLIGHT_LOCK:
+            _INFLIGHT_FILE_IDS.discard(file_id)
 
 # =========================
 # アプリ起動/停止時の処理
@@ -804,96 +1147,147 @@ async def polling_task():
     定期的にフォルダ内の新しいファイルをチェックするタスク
     """
     global _polling_task
-    print(f"[Drive] Polling task started. Interval: {GOOGLE_DRIVE_POLL_INTERVAL} seconds")
-    sys.stdout.flush()
+    logger.info(f"Polling task started. Interval: {GOOGLE_DRIVE_POLL_INTERVAL} seconds")
     
     while True:
         try:
             await asyncio.sleep(GOOGLE_DRIVE_POLL_INTERVAL)
             if NOTTA_DRIVE_FOLDER_ID:
-                print(f"[Drive] Polling for new files in folder: {NOTTA_DRIVE_FOLDER_ID}")
-                sys.stdout.flush()
-                # 同期的な関数を非同期で実行
-                loop = asyncio.get_event_loop()
-                await loop.run_in_executor(None, check_and_process_new_files, NOTTA_DRIVE_FOLDER_ID)
+                logger.info(f"Polling for new files in folder: {NOTTA_DRIVE_FOLDER_ID}")
+                # 同期的な関数を専用スレッドで実行（遅いDrive応答でデフォルトのスレッドプールを占有しない）
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(_poll_executor, check_and_process_new_files, NOTTA_DRIVE_FOLDER_ID)
         except asyncio.CancelledError:
-            print(f"[Drive] Polling task cancelled")
-            sys.stdout.flush()
+            logger.info("Polling task cancelled")
             break
         except Exception as e:
-            print(f"[Drive] Error in polling task: {e}")
+            logger.error(f"Error in polling task: {e}")
             import traceback
-            print(f"[Drive] Traceback: {traceback.format_exc()}")
-            sys.stdout.flush()
+            logger.error(f"Traceback: {traceback.format_exc()}")
+
+async def folder_scan_task(folder_id: str):
+    """
+    Webhook通知によるスキャン要求をまとめて実行するタスク
+    要求を受けてから DRIVE_SCAN_DEBOUNCE 秒の間に届いた通知は、1回のスキャンにまとめる
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        try:
+            await _scan_requested.wait()
+            await asyncio.sleep(DRIVE_SCAN_DEBOUNCE)
+            _scan_requested.clear()
+            await loop.run_in_executor(_poll_executor, check_and_process_new_files, folder_id)
+        except asyncio.CancelledError:
+            logger.info("Folder scan task cancelled")
+            break
+        except Exception as e:
+            logger.error(f"Error in folder scan task: {e}")
+            import traceback
+            logger.error(f"Traceback: {traceback.format_exc()}")
+
+def request_folder_scan(folder_id: str):
+    """
+    フォルダのスキャンを要求（スキャンタスク稼働中は通知をまとめ、未稼働なら直接スキャンを積む）
+    """
+    if _scan_requested is not None and _scan_task is not None and not _scan_task.done():
+        _scan_requested.set()
+    else:
+        _poll_executor.submit(check_and_process_new_files, folder_id)
 
 @app.on_event("startup")
 async def startup_event():
     """
-    アプリ起動時にGoogle Drive監視を開始
+    アプリ起動時にPDF生成用プロセスプールとスキャンタスクを用意し、Google Drive監視を開始
     """
-    global _polling_task
+    global _polling_task, _pdf_executor, _scan_requested, _scan_task
+    _pdf_executor = ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+    # ワーカープロセスを起動時に立ち上げておく（初回承認時の起動待ちをなくし、
+    # 他のスレッドが動き出す前にプロセスを生成する）
+    _pdf_executor.submit(int).add_done_callback(lambda f: f.exception())
+    
+    # Webhook通知によるスキャンをまとめるタスクを開始
+    if NOTTA_DRIVE_FOLDER_ID:
+        _scan_requested = asyncio.Event()
+        _scan_task = asyncio.create_task(folder_scan_task(NOTTA_DRIVE_FOLDER_ID))
+    
     if GOOGLE_DRIVE_WATCH_ENABLED and NOTTA_DRIVE_FOLDER_ID:
         try:
-            print(f"[Drive] Starting watch for folder: {NOTTA_DRIVE_FOLDER_ID}")
+            logger.info(f"Starting watch for folder: {NOTTA_DRIVE_FOLDER_ID}")
             channel_info = watch_drive_folder(NOTTA_DRIVE_FOLDER_ID)
-            print(f"[Drive] Watch started successfully")
-            sys.stdout.flush()
+            logger.info("Watch started successfully")
         except Exception as e:
-            print(f"[Drive] Failed to start watch: {e}")
+            logger.error(f"Failed to start watch: {e}")
             import traceback
-            print(f"[Drive] Traceback: {traceback.format_exc()}")
-            sys.stdout.flush()
+            logger.error(f"Traceback: {traceback.format_exc()}")
         
         # ポーリングタスクを開始（Push通知のバックアップとして）
         try:
             _polling_task = asyncio.create_task(polling_task())
-            print(f"[Drive] Polling task started")
-            sys.stdout.flush()
+            logger.info("Polling task started")
         except Exception as e:
-            print(f"[Drive] Failed to start polling task: {e}")
+            logger.error(f"Failed to start polling task: {e}")
             import traceback
-            print(f"[Drive] Traceback: {traceback.format_exc()}")
-            sys.stdout.flush()
+            logger.error(f"Traceback: {traceback.format_exc()}")
     else:
-        print(f"[Drive] Watch disabled or folder ID not set")
-        print(f"[Drive] GOOGLE_DRIVE_WATCH_ENABLED: {GOOGLE_DRIVE_WATCH_ENABLED}")
-        print(f"[Drive] NOTTA_DRIVE_FOLDER_ID: {NOTTA_DRIVE_FOLDER_ID}")
-        sys.stdout.flush()
+        logger.info("Watch disabled or folder ID not set")
+        logger.info(f"GOOGLE_DRIVE_WATCH_ENABLED: {GOOGLE_DRIVE_WATCH_ENABLED}")
+        logger.info(f"NOTTA_DRIVE_FOLDER_ID: {NOTTA_DRIVE_FOLDER_ID}")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """
-    アプリ停止時にGoogle Drive監視を停止
+    アプリ停止時にGoogle Drive監視・スキャンタスク・SMTPセッション・PDF生成用プロセスプールを停止
     """
     global _polling_task
+    # スキャン要求をまとめるタスクを停止
+    if _scan_task:
+        _scan_task.cancel()
+        try:
+            await _scan_task
+        except asyncio.CancelledError:
+            pass
+    
     # ポーリングタスクを停止
     if _polling_task:
         try:
             _polling_task.cancel()
             await _polling_task
-            print(f"[Drive] Polling task stopped")
-            sys.stdout.flush()
+            logger.info("Polling task stopped")
         except asyncio.CancelledError:
             pass
         except Exception as e:
-            print(f"[Drive] Error stopping polling task: {e}")
-            sys.stdout.flush()
+            logger.error(f"Error stopping polling task: {e}")
+    
+    # 保持しているSMTPセッションを切断
+    await asyncio.to_thread(close_gmail_sessions)
     
-    # Watchチャンネルを停止
+    # PDF生成用プロセスプールを停止
+    if _pdf_executor is not None:
+        await asyncio.to_thread(_pdf_executor.shutdown)
+    
+    # Watchチャンネルを停止（各チャンネルの停止を並行実行）
     if DRIVE_WATCH_CHANNEL_INFO:
         try:
+            stops = []
+            stopping_folders = []
             for folder_id, channel_info in DRIVE_WATCH_CHANNEL_INFO.items():
                 channel_id = channel_info.get("id")
                 resource_id = channel_info.get("resourceId")
                 if channel_id and resource_id:
-                    print(f"[Drive] Stopping watch for folder: {folder_id}")
-                    stop_watch_drive_folder(channel_id, resource_id)
-                    sys.stdout.flush()
+                    logger.info(f"Stopping watch for folder: {folder_id}")
+                    stops.append(asyncio.to_thread(stop_watch_drive_folder, channel_id, resource_id))
+                    stopping_folders.append(folder_id)
+            results = await asyncio.gather(*stops, return_exceptions=True)
+            for folder_id, result in zip(stopping_folders, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Error stopping watch: {result}")
+                elif result:
+                    # 停止済みのチャンネルは永続ストアから削除（次回起動時に読み込まない）
+                    del DRIVE_WATCH_CHANNEL_INFO[folder_id]
         except Exception as e:
-            print(f"[Drive] Error stopping watch: {e}")
+            logger.error(f"Error stopping watch: {e}")
             import traceback
-            print(f"[Drive] Traceback: {traceback.format_exc()}")
-            sys.stdout.flush()
+            logger.error(f"Traceback: {traceback.format_exc()}")
 
 # =========================
 # FastAPIエンドポイント
@@ -902,6 +1296,46 @@ async def shutdown_event():
 def health():
     return {"ok": True}
 
+def _copy_upload_file(src, dst) -> None:
+    """
+    アップロードされたファイルを保存先へコピー
+    一時ファイルとしてディスクに退避済みの場合は os.sendfile でカーネル内コピー（ユーザー空間を経由しない）
+    メモリ上にある場合や sendfile が使えない場合は通常のチャンクコピー
+    """
+    # 注: SpooledTemporaryFile は fileno() を呼ぶとディスクへ書き出されるため、退避済みの場合のみ使う
+    if hasattr(os, "sendfile") and getattr(src, "_rolled", False):
+        start = src.tell()
+        try:
+            src_fd, dst_fd = src.fileno(), dst.fileno()
+            offset = start
+            remaining = os.fstat(src_fd).st_size - offset
+            while remaining > 0:
+                sent = os.sendfile(dst_fd, src_fd, offset, remaining)
+                if sent == 0:
+                    break
+                offset += sent
+                remaining -= sent
+            return
+        except OSError:
+            # ファイルシステムが非対応の場合は通常のコピーでやり直す
+            src.seek(start)
+            dst.seek(0)
+            dst.truncate()
+    # 1つのバッファを readinto で使い回し、チャンクごとのbytes生成を避ける
+    # （open(buffering=0) の生書き込みは部分書き込みになり得るため、BufferedWriter 経由のまま書き込む。
+    #   バッファサイズ以上の書き込みは BufferedWriter 内で二重コピーされずにそのまま渡される）
+    readinto = getattr(src, "readinto", None)
+    if readinto is None:
+        shutil.copyfileobj(src, dst, UPLOAD_CHUNK_SIZE)
+        return
+    buf = bytearray(UPLOAD_CHUNK_SIZE)
+    view = memoryview(buf)
+    while True:
+        n = readinto(buf)
+        if not n:
+            break
+        dst.write(view[:n])
+
 @app.post("/upload")
 async def upload_audio(
     background: BackgroundTasks,
@@ -917,16 +1351,21 @@ async def upload_audio(
     draft_id = uuid.uuid4().hex
     ext = Path(audio.filename or "").suffix or ".webm"
     raw_path = UPLOAD_DIR / f"{draft_id}{ext}"
-    with raw_path.open("wb") as f:
-        shutil.copyfileobj(audio.file, f)
+
+    # ファイル書き込みはスレッドで実行し、イベントループをブロックしない
+    # （aiofiles等の非同期ファイルI/Oも内部はスレッドプールのため、チャンクごとにスレッドを往復させず、
+    #   コピー全体を1回のスレッド呼び出しで行う）
+    # 注: UploadFile はレスポンス送信後に閉じられるため、保存処理はBackgroundTasksへ移さずリクエスト内で完了させる
+    #     （本文は受信済みの一時ファイルからのコピーのみで、以降の重い処理はバックグラウンドで実行）
+    def _save_upload():
+        with raw_path.open("wb") as f:
+            _copy_upload_file(audio.file, f)
+            return os.fstat(f.fileno())
+    file_stat = await asyncio.to_thread(_save_upload)
     
-    # 音声ファイルの保存日時を取得（作成日時または更新日時の早い方）
-    file_stat = raw_path.stat()
-    created_time = file_stat.st_ctime
-    modified_time = file_stat.st_mtime
-    # より古い方の日時を使用
-    file_time = time.localtime(min(created_time, modified_time))
-    datetime_str = time.strftime("%Y年%m月%d日 | %H:%M", file_time)
+    # 音声ファイルの保存日時を取得（作成日時または更新日時の早い方、日本時間）
+    file_time = datetime.fromtimestamp(min(file_stat.st_ctime, file_stat.st_mtime), tz=JST)
+    datetime_str = file_time.strftime("%Y年%m月%d日 | %H:%M")
 
     background.add_task(process_pipeline, draft_id, raw_path, title or audio.filename, effective_channel, datetime_str)
     return {"accepted": True, "draft_id": draft_id}
@@ -960,89 +1399,84 @@ async def webhook_drive(request: Request, background: BackgroundTasks):
     """
     try:
         # リクエストヘッダーをログに記録
-        headers = dict(request.headers)
-        print(f"[Drive Webhook] Received request: {request.method} {request.url.path}")
-        print(f"[Drive Webhook] Headers: {headers}")
-        sys.stdout.flush()
+        webhook_logger.info(f"Received request: {request.method} {request.url.path}")
+        webhook_logger.debug("Headers: %s", request.headers)
         
-        # リクエストボディを取得
+        # リクエストボディを取得（Drive通知は小さなJSONのみのため、サイズ上限を超えるものは拒否）
+        content_length = request.headers.get("content-length", "")
+        if content_length.isdigit() and int(content_length) > WEBHOOK_MAX_BODY_BYTES:
+            webhook_logger.warning(f"Body too large: {content_length} bytes")
+            return JSONResponse(status_code=413, content={"error": "Payload too large"})
         body = await request.body()
-        print(f"[Drive Webhook] Body length: {len(body)} bytes")
-        if body:
-            print(f"[Drive Webhook] Body preview: {body[:500].decode('utf-8', errors='ignore')}")
-        sys.stdout.flush()
+        if len(body) > WEBHOOK_MAX_BODY_BYTES:
+            webhook_logger.warning(f"Body too large: {len(body)} bytes")
+            return JSONResponse(status_code=413, content={"error": "Payload too large"})
+        webhook_logger.info(f"Body length: {len(body)} bytes")
+        if body and webhook_logger.isEnabledFor(logging.DEBUG):
+            webhook_logger.debug("Body preview: %s", body[:500].decode('utf-8', errors='ignore'))
         
         # JSONとして解析
         try:
-            notification = json.loads(body.decode("utf-8"))
-            print(f"[Drive Webhook] Parsed notification: {json.dumps(notification, indent=2, ensure_ascii=False)}")
-            sys.stdout.flush()
-        except json.JSONDecodeError as e:
-            print(f"[Drive Webhook] Invalid JSON in request body: {e}")
-            sys.stdout.flush()
+            notification = orjson.loads(body)
+            webhook_logger.debug("Parsed notification: %s", notification)
+        except orjson.JSONDecodeError as e:
+            webhook_logger.error(f"Invalid JSON in request body: {e}")
             return JSONResponse(status_code=400, content={"error": "Invalid JSON"})
         
         # 通知タイプを確認
         notification_type = notification.get("type", "")
-        print(f"[Drive Webhook] Notification type: {notification_type}")
-        sys.stdout.flush()
+        webhook_logger.info(f"Notification type: {notification_type}")
         
         # 同期通知（初期チャレンジ）
         if notification_type == "sync":
-            print("[Drive Webhook] Received sync notification (initial challenge)")
+            webhook_logger.info("Received sync notification (initial challenge)")
             # チャレンジ値を返す
             challenge = notification.get("challenge", "")
             if challenge:
-                print(f"[Drive Webhook] Returning challenge: {challenge}")
-                sys.stdout.flush()
+                webhook_logger.info(f"Returning challenge: {challenge}")
                 return JSONResponse(content={"challenge": challenge})
             else:
-                print("[Drive Webhook] No challenge in sync notification")
-                sys.stdout.flush()
+                webhook_logger.warning("No challenge in sync notification")
                 return JSONResponse(status_code=400, content={"error": "No challenge"})
         
         # 変更通知
         elif notification_type == "change":
-            print("[Drive Webhook] Received change notification")
+            webhook_logger.info("Received change notification")
             
             # Webhook検証（オプション）
             if GOOGLE_DRIVE_WEBHOOK_SECRET:
                 token = notification.get("token", "")
                 if token != GOOGLE_DRIVE_WEBHOOK_SECRET:
-                    print("[Drive Webhook] Invalid token")
-                    sys.stdout.flush()
+                    webhook_logger.error("Invalid token")
                     return JSONResponse(status_code=403, content={"error": "Invalid token"})
             
             # 変更されたリソースのIDを取得
             resource_id = notification.get("resourceId", "")
             if not resource_id:
-                print("[Drive Webhook] No resourceId in notification")
-                sys.stdout.flush()
+                webhook_logger.warning("No resourceId in notification")
                 return JSONResponse(status_code=400, content={"error": "No resourceId"})
             
-            print(f"[Drive Webhook] Resource ID: {resource_id}")
-            sys.stdout.flush()
+            webhook_logger.info(f"Resource ID: {resource_id}")
             
             # 変更を検出したら、フォルダ内のファイルをチェック
             if NOTTA_DRIVE_FOLDER_ID:
-                print(f"[Drive Webhook] Triggering check for folder: {NOTTA_DRIVE_FOLDER_ID}")
-                sys.stdout.flush()
+                webhook_logger.info(f"Triggering check for folder: {NOTTA_DRIVE_FOLDER_ID}")
                 # フォルダ内の新しいファイルを検出して処理
-                background.add_task(check_and_process_new_files, NOTTA_DRIVE_FOLDER_ID)
+                # （連続した通知は1回のスキャンにまとめ、ポーリングと同じ専用スレッドで実行する。
+                #   スキャン内の各ファイルはスレッドプールで並列処理される）
+                request_folder_scan(NOTTA_DRIVE_FOLDER_ID)
             
             return JSONResponse(status_code=200, content={"ok": True})
         
         # 不明な通知タイプ
         else:
-            print(f"[Drive Webhook] Unknown notification type: {notification_type}")
-            sys.stdout.flush()
+            webhook_logger.warning(f"Unknown notification type: {notification_type}")
             return JSONResponse(status_code=400, content={"error": "Unknown notification type"})
     
     except Exception as e:
-        print(f"[Drive Webhook] Error processing notification: {e}")
+        webhook_logger.error(f"Error processing notification: {e}")
         import traceback
-        print(f"[Drive Webhook] Traceback: {traceback.format_exc()}")
-        sys.stdout.flush()
+        webhook_logger.error(f"Traceback: {traceback.format_exc()}")
         return JSONResponse(status_code=500, content={"error": str(e)})
 
 @app.get("/webhook/drive")
@@ -1050,71 +1484,183 @@ async def webhook_drive_get():
     """
     Google Drive Push通知のWebhookエンドポイント（GET - 初期検証用）
     """
-    print(f"[Drive Webhook] Received GET request")
-    sys.stdout.flush()
+    webhook_logger.info("Received GET request")
     return JSONResponse(status_code=200, content={"status": "ok", "message": "Webhook endpoint is ready"})
 
+# Drive Changes API の pageToken 保存先（再起動後も差分取得を継続）
+DRIVE_PAGE_TOKEN_PATH = DATA_DIR / "drive_page_token"
+
+def _load_drive_page_token() -> Optional[str]:
+    """保存済みのDrive Changes pageTokenを読み込む（未保存ならNone）"""
+    try:
+        return DRIVE_PAGE_TOKEN_PATH.read_text(encoding="utf-8").strip() or None
+    except FileNotFoundError:
+        return None
+
+def _save_drive_page_token(token: str) -> None:
+    """Drive Changes pageTokenを保存"""
+    DRIVE_PAGE_TOKEN_PATH.write_text(token, encoding="utf-8")
+
+# 処理に失敗したファイルごとの試行回数の保存先（pageTokenと同じ場所に保存）
+DRIVE_RETRY_COUNTS_PATH = DATA_DIR / "drive_retry_counts.json"
+# 1ファイルあたりの最大試行回数（超えたら諦めてpageTokenを進める）
+DRIVE_MAX_FILE_ATTEMPTS = 3
+
+def _load_drive_retry_counts() -> dict:
+    """保存済みの試行回数 {file_id: 回数} を読み込む（未保存・破損時は空）"""
+    try:
+        return orjson.loads(DRIVE_RETRY_COUNTS_PATH.read_bytes())
+    except (FileNotFoundError, orjson.JSONDecodeError):
+        return {}
+
+def _save_drive_retry_counts(counts: dict) -> None:
+    """試行回数を保存（再試行中のファイルがなければファイルを削除）"""
+    if counts:
+        DRIVE_RETRY_COUNTS_PATH.write_bytes(orjson.dumps(counts))
+    else:
+        DRIVE_RETRY_COUNTS_PATH.unlink(missing_ok=True)
+
+def list_changed_text_files(service, folder_id: str, page_token: str):
+    """
+    Drive Changes API で前回以降に変更されたフォルダ内のテキストファイルを取得
+    戻り値: (ファイルメタデータのリスト, 次回用のpageToken)
+    """
+    changed = {}
+    new_start_token = None
+    while page_token:
+        results = service.changes().list(
+            pageToken=page_token,
+            fields="nextPageToken, newStartPageToken, changes(removed, file(id, name, createdTime, mimeType, size, parents, trashed, appProperties))",
+            pageSize=100,
+            includeRemoved=False,
+            supportsAllDrives=True,
+            includeItemsFromAllDrives=True
+        ).execute()
+        for change in results.get("changes", []):
+            file = change.get("file")
+            if change.get("removed") or not file or file.get("trashed"):
+                continue
+            if file.get("mimeType") != "text/plain" or folder_id not in file.get("parents", []):
+                continue
+            # 同じファイルの複数回の変更は1件にまとめる
+            changed[file["id"]] = file
+        page_token = results.get("nextPageToken")
+        new_start_token = results.get("newStartPageToken", new_start_token)
+    return list(changed.values()), new_start_token
+
 def check_and_process_new_files(folder_id: str):
     """
     フォルダ内の新しいファイルをチェックして処理（バックグラウンドタスク）
+    2回目以降は Drive Changes API で前回以降の差分のみ取得する
     """
     try:
-        print(f"[Drive] Checking new files in folder: {folder_id}")
-        sys.stdout.flush()
+        logger.info(f"Checking new files in folder: {folder_id}")
         
         service = get_drive_service("drive.readonly")
         
-        # フォルダ内のファイルを一覧取得
-        query = f"'{folder_id}' in parents and trashed=false and mimeType='text/plain'"
-        print(f"[Drive] Query: {query}")
-        sys.stdout.flush()
-        
-        results = service.files().list(
-            q=query,
-            fields="files(id, name, createdTime, modifiedTime, mimeType)",
-            orderBy="createdTime desc",
-            pageSize=10,  # 最新10件をチェック
-            supportsAllDrives=True,
-            includeItemsFromAllDrives=True
-        ).execute()
-        
-        files = results.get("files", [])
-        print(f"[Drive] Found {len(files)} text files in folder")
-        sys.stdout.flush()
+        page_token = _load_drive_page_token()
+        if page_token:
+            # 前回以降の変更のみ取得
+            files, new_page_token = list_changed_text_files(service, folder_id, page_token)
+            logger.info(f"Found {len(files)} changed text files in folder")
+        else:
+            # 初回: 差分取得の起点となるトークンを取得し、フォルダ内の最新ファイルを一覧で確認
+            new_page_token = service.changes().getStartPageToken(supportsAllDrives=True).execute().get("startPageToken")
+            
+            # 処理済みマーク付きのファイルはサーバー側で除外
+            query = f"'{folder_id}' in parents and trashed=false and mimeType='text/plain' and {UNPROCESSED_QUERY}"
+            logger.info(f"Query: {query}")
+            
+            results = service.files().list(
+                q=query,
+                fields="files(id, name, createdTime, mimeType, size, appProperties)",
+                orderBy="createdTime desc",
+                pageSize=10,  # 最新10件をチェック
+                supportsAllDrives=True,
+                includeItemsFromAllDrives=True
+            ).execute()
+            
+            files = results.get("files", [])
+            logger.info(f"Found {len(files)} text files in folder")
         
-        # 各ファイルをチェックして処理
-        processed_count = 0
+        # 未処理のファイルを抽出
+        pending = []
         for file in files:
             file_id = file.get("id")
             file_name = file.get("name", "")
             
-            # 既に処理済みか確認
-            if is_file_processed(file_name):
-                print(f"[Drive] Skipping processed file: {file_name}")
-                sys.stdout.flush()
+            # 既に処理済みか確認（このプロセスで処理済み・処理中のID、またはメタデータの処理済みマーク）
+            if _is_processed_or_inflight(file_id) or is_file_processed(file):
+                logger.info(f"Skipping processed file: {file_name}")
                 continue
-            
-            # 処理を開始
-            print(f"[Drive] Processing new file: {file_name} ({file_id})")
-            sys.stdout.flush()
+            pending.append(file)
+        
+        # 各ファイルをスレッドプールで並列処理（ダウンロードはレイテンシ律速のため）
+        # 一覧取得時のメタデータを渡し、ファイルごとの files().get を省略
+        # （本文のダウンロードはDriveのバッチリクエストが非対応のため、ファイルごとに取得）
+        # 処理済みマークは処理後にバッチでまとめて行う
+        futures = []
+        for file in pending:
+            logger.info(f"Processing new file: {file.get('name', '')} ({file.get('id')})")
+            futures.append((file, _drive_executor.submit(
+                process_drive_file_notification, file.get("id"), file_meta=file, mark_processed=False
+            )))
+        
+        processed_count = 0
+        processed_files = []
+        for file, future in futures:
+            file_id = file.get("id")
             try:
-                process_drive_file_notification(file_id)
+                if future.result():
+                    processed_files.append((file_id, file.get("name", "")))
                 processed_count += 1
             except Exception as e:
-                print(f"[Drive] Error processing file {file_id}: {e}")
+                logger.error(f"Error processing file {file_id}: {e}")
                 import traceback
-                print(f"[Drive] Traceback: {traceback.format_exc()}")
-                sys.stdout.flush()
-                continue
+                logger.error(f"Traceback: {traceback.format_exc()}")
+        
+        if processed_files:
+            mark_files_as_processed(processed_files)
+        
+        logger.info(f"Processed {processed_count} new file(s)")
+        
+        # 処理に失敗したファイル（処理済みIDに登録されず、Webhook等で処理中でもないもの）
+        with _INFLIGHT_LOCK:
+            failed_ids = [
+                file.get("id") for file in pending
+                if file.get("id") not in PROCESSED_FILE_IDS and file.get("id") not in _INFLIGHT_FILE_IDS
+            ]
+        
+        # 試行回数を数え、上限に達したファイルは諦める
+        counts = _load_drive_retry_counts()
+        retry_counts = {}
+        dropped_ids = []
+        for file_id in failed_ids:
+            attempts = counts.get(file_id, 0) + 1
+            if attempts >= DRIVE_MAX_FILE_ATTEMPTS:
+                dropped_ids.append(file_id)
+            else:
+                retry_counts[file_id] = attempts
+        if retry_counts != counts:
+            _save_drive_retry_counts(retry_counts)
         
-        print(f"[Drive] Processed {processed_count} new file(s)")
-        sys.stdout.flush()
+        if dropped_ids:
+            logger.error(f"Giving up on {len(dropped_ids)} file(s) after {DRIVE_MAX_FILE_ATTEMPTS} attempts: {dropped_ids}")
         
+        if retry_counts:
+            # 失敗したファイルを次回のポーリングで再取得できるよう、トークンは進めない
+            logger.warning(f"{len(retry_counts)} file(s) failed, keeping pageToken for retry: {list(retry_counts)}")
+        elif new_page_token and new_page_token != page_token:
+            # 変更がなくトークンが進んでいない場合は書き込みを省略
+            _save_drive_page_token(new_page_token)
+        
+    except RefreshError as e:
+        logger.error(f"Drive credentials refresh failed, client will be rebuilt: {e}")
+        reset_drive_service()
     except Exception as e:
-        print(f"[Drive] Error checking new files: {e}")
+        logger.error(f"Error checking new files: {e}")
         import traceback
-        print(f"[Drive] Traceback: {traceback.format_exc()}")
-        sys.stdout.flush()
+        logger.error(f"Traceback: {traceback.format_exc()}")
 
 def process_drive_file_task(draft_id: str, file_id: str, channel_id: str):
     """
@@ -1122,15 +1668,14 @@ def process_drive_file_task(draft_id: str, file_id: str, channel_id: str):
     """
     try:
         # 1. ファイルメタデータを取得
-        print(f"[Drive] Processing file ID: {file_id}")
+        logger.info(f"Processing file ID: {file_id}")
         metadata = get_file_metadata(file_id)
         file_name = metadata.get("name", "")
         created_time = metadata.get("createdTime", "")
-        modified_time = metadata.get("modifiedTime", created_time)
         
         # 2. 処理済みかチェック
-        if is_file_processed(file_name):
-            print(f"[Drive] File already processed: {file_name}")
+        if is_file_processed(metadata):
+            logger.info(f"File already processed: {file_name}")
             return
         
         # 3. ファイル名から日時を抽出（ファイル名に日時が含まれている場合）
@@ -1141,63 +1686,227 @@ def process_drive_file_task(draft_id: str, file_id: str, channel_id: str):
                 dt = datetime.fromisoformat(created_time.replace("Z", "+00:00"))
                 datetime_str = dt.strftime("%Y年%m月%d日 | %H:%M")
             except Exception as e:
-                print(f"[Drive] Failed to parse datetime: {e}")
+                logger.error(f"Failed to parse datetime: {e}")
                 datetime_str = time.strftime("%Y年%m月%d日 | %H:%M", time.localtime())
         else:
             datetime_str = time.strftime("%Y年%m月%d日 | %H:%M", time.localtime())
         
-        # 4. テキストファイルをダウンロード
-        text = download_text_from_drive(file_id)
+        # 4. テキストファイルを文字起こし保存先へ直接ダウンロード
+        size = metadata.get("size")
+        text = download_text_from_drive(file_id, int(size) if size else None, dest_path=TRANS_DIR / f"{draft_id}.txt")
         
         if not text or not text.strip():
-            print(f"[Drive] Empty text file: {file_id}")
+            logger.info(f"Empty text file: {file_id}")
             return
         
         # 5. ファイル名からタイトルを生成（拡張子を除く）
         title = Path(file_name).stem if file_name else "議事録"
         
-        # 6. テキストを処理
-        process_text_pipeline(draft_id, text, title, channel_id, datetime_str)
+        # 6. テキストを処理（文字起こしはダウンロード時に保存済み）
+        process_text_pipeline(draft_id, text, title, channel_id, datetime_str, transcript_saved=True)
         
-        # 7. 処理完了後、ファイル名を変更
+        # 7. 処理完了後、処理済みをマーク
         mark_file_as_processed(file_id, file_name)
         
-        print(f"[Drive] File processed successfully: {file_id}")
+        logger.info(f"File processed successfully: {file_id}")
         
     except HttpError as e:
-        print(f"[Drive] Error processing file {file_id}: {e}")
+        logger.error(f"Error processing file {file_id}: {e}")
         raise
     except Exception as e:
-        print(f"[Drive] Unexpected error processing file {file_id}: {e}")
+        logger.error(f"Unexpected error processing file {file_id}: {e}")
         raise
 
-def process_pipeline(draft_id: str, raw_path: Path, title: str, channel_id: str, datetime_str: str):
-    """音声ファイルからテキストを抽出して処理"""
-    text = transcribe_audio(raw_path)
+# 文字起こしテキストの保存用（要約・Slack投稿の処理を待たせないよう別スレッドで書き込む）
+_transcript_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="transcript")
+
+def _save_transcript(draft_id: str, text: str) -> None:
+    """文字起こしテキストをバックグラウンドで保存"""
+    def _log_error(future):
+        if future.exception():
+            transcript_logger.error(f"Failed to save transcript {draft_id}: {future.exception()}")
     trans_path = TRANS_DIR / f"{draft_id}.txt"
-    trans_path.write_text(text, encoding="utf-8")
-    draft = summarize_to_structured(text)
+    _transcript_executor.submit(trans_path.write_text, text, encoding="utf-8").add_done_callback(_log_error)
+
+async def process_pipeline(draft_id: str, raw_path: Path, title: str, channel_id: str, datetime_str: str):
+    """
+    音声ファイルからテキストを抽出して処理
+    OpenAIの呼び出しは非同期クライアントで待機し、BackgroundTasksのスレッドを占有しない
+    """
+    text = await transcribe_audio_async(raw_path)
+    _save_transcript(draft_id, text)
+    draft = await summarize_to_structured_async(text)
     draft.title = title.strip()[:200]
     draft.datetime_str = datetime_str  # 音声ファイルの保存日時を設定
-    save_json(SUMM_DIR / f"{draft_id}.json", draft.dict())
-    post_slack_draft(channel_id, draft_id, draft.title, draft, DRAFT_META)
+    await asyncio.to_thread(save_json, SUMM_DIR / f"{draft_id}.json", draft.model_dump())
+    await asyncio.to_thread(post_slack_draft, channel_id, draft_id, draft.title, draft, DRAFT_META)
 
-def process_text_pipeline(draft_id: str, text: str, title: str, channel_id: str, datetime_str: str):
-    """テキストを直接受け取って処理（Nottaからの文字起こしテキスト用）"""
-    trans_path = TRANS_DIR / f"{draft_id}.txt"
-    trans_path.write_text(text, encoding="utf-8")
+def process_text_pipeline(draft_id: str, text: str, title: str, channel_id: str, datetime_str: str,
+                          transcript_saved: bool = False):
+    """
+    テキストを直接受け取って処理（Nottaからの文字起こしテキスト用）
+    transcript_saved: 文字起こしテキストが保存済みの場合はTrue（Driveからの直接ダウンロード時）
+    """
+    if not transcript_saved:
+        _save_transcript(draft_id, text)
     draft = summarize_to_structured(text)
     draft.title = title.strip()[:200]
     draft.datetime_str = datetime_str
-    save_json(SUMM_DIR / f"{draft_id}.json", draft.dict())
+    save_json(SUMM_DIR / f"{draft_id}.json", draft.model_dump())
     post_slack_draft(channel_id, draft_id, draft.title, draft, DRAFT_META)
 
+async def _render_pdf(func, *args):
+    """
+    PDF生成関数をプロセスプールで実行（プール未生成・利用不可の場合はスレッドで実行）
+    """
+    if _pdf_executor is not None:
+        try:
+            return await asyncio.get_running_loop().run_in_executor(_pdf_executor, func, *args)
+        except BrokenProcessPool as e:
+            pdf_logger.warning(f"Process pool unavailable, falling back to thread: {e}")
+    return await asyncio.to_thread(func, *args)
+
+# PDFファイル名用：datetime_strから日付を抽出するパターン（例："2025年11月3日 | 14:00" → "2025-11-03"）
+_PDF_DATE_PATTERNS = tuple(re.compile(p) for p in (
+    r"(\d{4})年(\d{1,2})月(\d{1,2})日",
+    r"(\d{4})-(\d{1,2})-(\d{1,2})",
+    r"(\d{4})/(\d{1,2})/(\d{1,2})",
+))
+# ファイル名に使えない文字
+_FILENAME_UNSAFE_RE = re.compile(r'[<>:"/\\|?*]')
+
+async def run_approval_pipeline(draft_id: str, d: Draft, channel: str, ts: Optional[str]):
+    """
+    承認後の処理（PDF生成・Gmail送信・Drive保存・Slack投稿・リマインド登録）
+    Slackへの応答（3秒以内）を妨げないよう、バックグラウンドタスクとして実行する
+    """
+    # PDF命名用ヘルパー：日付と会議名を取得
+    # datetime_strから日付を抽出（例："2025年11月3日 | 14:00" → "2025-11-03"）
+    pdf_date_str = ""
+    if d.datetime_str:
+        # 日付形式を抽出
+        for pattern in _PDF_DATE_PATTERNS:
+            match = pattern.search(d.datetime_str)
+            if match:
+                year, month, day = match.groups()
+                pdf_date_str = f"{year}-{int(month):02d}-{int(day):02d}"
+                break
+    # 日付が取得できない場合は現在日付を使用
+    if not pdf_date_str:
+        pdf_date_str = datetime.now().strftime("%Y-%m-%d")
+    
+    # 会議名を取得（10文字制限）
+    meeting_name_for_file = (d.meeting_name or d.title or "議事録")[:10]
+    # ファイル名に使えない文字を置換
+    meeting_name_for_file = _FILENAME_UNSAFE_RE.sub('_', meeting_name_for_file)
+    
+    # --- ① 議事録PDF（命名規則：yyyy-mm-dd_議事録_会議名.pdf）
+    pdf_filename = f"{pdf_date_str}_議事録_{meeting_name_for_file}.pdf"
+    pdf_path = PDF_DIR / pdf_filename
+
+    # --- ② 設計チェックリストPDF（命名規則：yyyy-mm-dd_設計チェックリスト_会議名.pdf）
+    checklist_filename = f"{pdf_date_str}_設計チェックリスト_{meeting_name_for_file}.pdf"
+    checklist_path = PDF_DIR / checklist_filename
+
+    # PDF生成（同期処理）はプロセスプールで並行実行し、イベントループとGILをブロックしない
+    # 議事録PDFのバイト列はメール添付・Drive保存で共有し、ファイルを再読み込みしない
+    pdf_bytes, _ = await asyncio.gather(
+        _render_pdf(create_minutes_pdf, d, pdf_path),
+        _render_pdf(create_design_checklist_pdf, checklist_path, d),
+    )
+
+    # PDF生成後の処理は依存関係ごとに4系統に分け、並行実行する（各系統のエラーは系統内で処理して続行）
+    #   A: ③ Gmail送信・④ Drive保存 → ⑤ 完了メッセージ（Driveリンクを含むため保存完了後に投稿）
+    #   B: ⑥ 議事録PDF・⑦ 設計チェックリストPDFの添付
+    #   C: ⑧ タスクリストの投稿
+    #   D: ⑨ リマインドのスケジュール
+    async def notify_completion():
+        # --- ③ Gmail送信 / ④ Drive保存（互いに独立した処理のため並行実行、エラーが発生しても続行）
+        send_gmail = bool(GMAIL_USER and GMAIL_PASS)
+        save_drive = bool(GOOGLE_SERVICE_ACCOUNT_JSON or (GOOGLE_SERVICE_ACCOUNT_PATH and os.path.exists(GOOGLE_SERVICE_ACCOUNT_PATH)))
+        gmail_result, drive_result = await asyncio.gather(
+            asyncio.to_thread(
+                send_via_gmail,
+                GMAIL_USER, GMAIL_PASS, GMAIL_USER,
+                f"[議事録承認] {d.title}",
+                "承認済み議事録を添付します。",
+                pdf_path, pdf_bytes
+            ) if send_gmail else asyncio.sleep(0),
+            asyncio.to_thread(upload_to_drive, pdf_path, pdf_bytes) if save_drive else asyncio.sleep(0),
+            return_exceptions=True,
+        )
+        if isinstance(gmail_result, Exception):
+            gmail_logger.error(f"Send failed: {gmail_result}")
+        drive_file = None
+        if isinstance(drive_result, Exception):
+            logger.error(f"Upload failed: {drive_result}")
+        elif save_drive:
+            drive_file = drive_result
+
+        # --- ⑤ 完了メッセージ ---
+        msg = "✅ PDF化・メール送信・Google Drive保存を完了しました。"
+        if drive_file and drive_file.get("webViewLink"):
+            msg += f"\n🔗 Drive: {drive_file['webViewLink']}"
+        try:
+            await asyncio.to_thread(client_slack.chat_postMessage, channel=channel, thread_ts=ts, text=msg)
+        except Exception as e:
+            slack_logger.error(f"completion post failed: {e}")
+
+    async def upload_pdfs():
+        # --- ⑥ 議事録PDFを添付 ---
+        # files_upload_v2 は共有完了（completeUploadExternal）まで待って戻るため、
+        # 固定のsleepを挟まず、順番にawaitするだけで2つのPDFの投稿順を保つ
+        try:
+            await asyncio.to_thread(
+                client_slack.files_upload_v2,
+                channels=channel, thread_ts=ts,
+                initial_comment="議事録PDFを添付します。",
+                file=str(pdf_path), filename=pdf_path.name,
+                title=f"議事録：{d.title}"
+            )
+        except Exception as e:
+            slack_logger.error(f"file upload failed: {e}")
+
+        # --- ⑦ 設計チェックリストPDFを添付 ---
+        try:
+            await asyncio.to_thread(
+                client_slack.files_upload_v2,
+                channels=channel, thread_ts=ts,
+                initial_comment="設計チェックリストPDFを添付します。",
+                file=str(checklist_path), filename=checklist_path.name,
+                title="設計チェックリスト"
+            )
+        except Exception as e:
+            slack_logger.error(f"file upload failed: {e}")
+
+    async def post_tasks():
+        # --- ⑧ タスクリストを同スレッドに表示 ---
+        try:
+            await asyncio.to_thread(
+                client_slack.chat_postMessage,
+                channel=channel, thread_ts=ts,
+                blocks=build_tasks_blocks(d, draft_id),
+                text="アクションアイテム＆タスク"
+            )
+        except Exception as e:
+            slack_logger.error(f"tasks post failed: {e}")
+
+    async def schedule_reminders():
+        # --- ⑨ リマインドをスケジュール（前日/1時間前） ---
+        try:
+            await asyncio.to_thread(schedule_task_reminders, channel, ts, d)
+            await asyncio.to_thread(client_slack.chat_postMessage, channel=channel, thread_ts=ts, text="⏰ タスクのリマインドをスケジュールしました。")
+        except Exception as e:
+            slack_logger.error(f"reminder schedule failed: {e}")
+
+    await asyncio.gather(notify_completion(), upload_pdfs(), post_tasks(), schedule_reminders())
+
 @app.post("/slack/actions")
-async def slack_actions(request: Request, x_slack_signature: str = Header(default=""), x_slack_request_timestamp: str = Header(default="")):
+async def slack_actions(request: Request, background: BackgroundTasks, x_slack_signature: str = Header(default=""), x_slack_request_timestamp: str = Header(default="")):
     raw = await request.body()
     verify_slack_signature(raw, x_slack_request_timestamp, x_slack_signature)
     form = await request.form()
-    payload = json.loads(form["payload"])
+    payload = orjson.loads(form["payload"])
     ptype = payload.get("type")
 
     # --- ボタン ---
@@ -1208,31 +1917,22 @@ async def slack_actions(request: Request, x_slack_signature: str = Header(defaul
         # task_completeの場合は特別処理（valueが"{draft_id}:{task_index}"形式のため）
         if action_id == "task_complete":
             # タスク完了処理
-            value = action.get("value", "")
-            if ":" in value:
-                task_draft_id, task_index = value.split(":", 1)
-                try:
-                    task_index = int(task_index)
-                    # タスクサービスを使用してタスクを完了状態にマーク
-                    task_d, updated_blocks = mark_task_complete(task_draft_id, task_index)
-                    if task_d and updated_blocks:
-                        # メッセージを更新して完了状態を表示
-                        channel = payload.get("channel", {}).get("id") or DEFAULT_SLACK_CHANNEL
-                        message_ts = payload.get("message", {}).get("ts")
-                        if channel and message_ts:
-                            update_task_block_in_slack(channel, message_ts, updated_blocks)
-                except (ValueError, IndexError) as e:
-                    print(f"[Task] Error processing task complete: {e}")
+            # （partition は区切りの有無の判定と分割を1回の走査で行い、リストも生成しない）
+            task_draft_id, sep, task_index = action.get("value", "").partition(":")
+            if sep:
+                channel = payload.get("channel", {}).get("id") or DEFAULT_SLACK_CHANNEL
+                message_ts = payload.get("message", {}).get("ts")
+                # 完了処理とSlack更新はバックグラウンドで実行し、Slackの3秒以内の応答期限に間に合わせる
+                background.add_task(complete_task_and_update_slack, task_draft_id, task_index, channel, message_ts)
             return JSONResponse({"response_action": "clear"})
         
         # その他のアクション（edit, approveなど）ではvalueがdraft_id
         draft_id = action.get("value")
-        summ_path = SUMM_DIR / f"{draft_id}.json"
-        data = json.loads(summ_path.read_text(encoding="utf-8"))
-        d = Draft(**data)
+        d = load_draft(draft_id)
 
         if action_id == "edit":
-            client_slack.views_open(trigger_id=payload["trigger_id"], view=build_edit_modal(draft_id, d))
+            # trigger_id の有効期限内にモーダルを開く必要があるため応答前に実行（イベントループはブロックしない）
+            await asyncio.to_thread(client_slack.views_open, trigger_id=payload["trigger_id"], view=build_edit_modal(draft_id, d))
             return JSONResponse({"response_action": "clear"})
 
         if action_id == "approve":
@@ -1250,112 +1950,10 @@ async def slack_actions(request: Request, x_slack_signature: str = Header(defaul
             # シンプルな承認済みメッセージ（本文のみ）
             approved_text = f"✅ 承認済み議事録：{date_str} {meeting_name}"
             if ts:
-                client_slack.chat_update(channel=channel, ts=ts, text=approved_text, blocks=[])
-
-            # PDF命名用ヘルパー：日付と会議名を取得
-            # datetime_strから日付を抽出（例："2025年11月3日 | 14:00" → "2025-11-03"）
-            pdf_date_str = ""
-            if d.datetime_str:
-                # 日付形式を抽出
-                date_patterns = [
-                    r"(\d{4})年(\d{1,2})月(\d{1,2})日",
-                    r"(\d{4})-(\d{1,2})-(\d{1,2})",
-                    r"(\d{4})/(\d{1,2})/(\d{1,2})",
-                ]
-                for pattern in date_patterns:
-                    match = re.search(pattern, d.datetime_str)
-                    if match:
-                        year, month, day = match.groups()
-                        pdf_date_str = f"{year}-{int(month):02d}-{int(day):02d}"
-                        break
-            # 日付が取得できない場合は現在日付を使用
-            if not pdf_date_str:
-                pdf_date_str = datetime.now().strftime("%Y-%m-%d")
-            
-            # 会議名を取得（10文字制限）
-            meeting_name_for_file = (d.meeting_name or d.title or "議事録")[:10]
-            # ファイル名に使えない文字を置換
-            meeting_name_for_file = re.sub(r'[<>:"/\\|?*]', '_', meeting_name_for_file)
-            
-            # --- ① 議事録PDF（命名規則：yyyy-mm-dd_議事録_会議名.pdf）
-            pdf_filename = f"{pdf_date_str}_議事録_{meeting_name_for_file}.pdf"
-            pdf_path = PDF_DIR / pdf_filename
-            await create_pdf_async(d, pdf_path)
-
-            # --- ② 設計チェックリストPDF（命名規則：yyyy-mm-dd_設計チェックリスト_会議名.pdf）
-            checklist_filename = f"{pdf_date_str}_設計チェックリスト_{meeting_name_for_file}.pdf"
-            checklist_path = PDF_DIR / checklist_filename
-            create_design_checklist_pdf(checklist_path, d)
-
-            # --- ③ Gmail送信（独立した処理、エラーが発生しても続行）
-            if GMAIL_USER and GMAIL_PASS:
-                try:
-                    send_via_gmail(
-                        GMAIL_USER, GMAIL_PASS, GMAIL_USER,
-                        f"[議事録承認] {d.title}",
-                        "承認済み議事録を添付します。",
-                        pdf_path
-                    )
-                except Exception as e:
-                    print(f"[Gmail] Send failed: {e}")
-
-            # --- ④ Drive保存（独立した処理、エラーが発生しても続行）
-            drive_file = None
-            if GOOGLE_SERVICE_ACCOUNT_JSON or (GOOGLE_SERVICE_ACCOUNT_PATH and os.path.exists(GOOGLE_SERVICE_ACCOUNT_PATH)):
-                try:
-                    drive_file = upload_to_drive(pdf_path)
-                except Exception as e:
-                    print(f"[Drive] Upload failed: {e}")
-                    drive_file = None
-
-            # --- ⑤ 完了メッセージ（最初に投稿） ---
-            msg = "✅ PDF化・メール送信・Google Drive保存を完了しました。"
-            if drive_file and drive_file.get("webViewLink"):
-                msg += f"\n🔗 Drive: {drive_file['webViewLink']}"
-            client_slack.chat_postMessage(channel=channel, thread_ts=ts, text=msg)
-
-            # --- ⑥ 議事録PDFを添付 ---
-            try:
-                client_slack.files_upload_v2(
-                    channels=channel, thread_ts=ts,
-                    initial_comment="議事録PDFを添付します。",
-                    file=str(pdf_path), filename=pdf_path.name,
-                    title=f"議事録：{d.title}"
-                )
-                # アップロード完了を待つ（Slack側の処理順序を保証）
-                time.sleep(0.5)
-            except Exception as e:
-                print(f"[Slack] file upload failed: {e}")
+                background.add_task(client_slack.chat_update, channel=channel, ts=ts, text=approved_text, blocks=[])
 
-            # --- ⑦ 設計チェックリストPDFを添付 ---
-            try:
-                client_slack.files_upload_v2(
-                    channels=channel, thread_ts=ts,
-                    initial_comment="設計チェックリストPDFを添付します。",
-                    file=str(checklist_path), filename=checklist_path.name,
-                    title="設計チェックリスト"
-                )
-                # アップロード完了を待つ（Slack側の処理順序を保証）
-                time.sleep(0.5)
-            except Exception as e:
-                print(f"[Slack] file upload failed: {e}")
-
-            # --- ⑧ タスクリストを同スレッドに表示 ---
-            try:
-                client_slack.chat_postMessage(
-                    channel=channel, thread_ts=ts,
-                    blocks=build_tasks_blocks(d, draft_id),
-                    text="アクションアイテム＆タスク"
-                )
-            except Exception as e:
-                print(f"[Slack] tasks post failed: {e}")
-
-            # --- ⑨ リマインドをスケジュール（前日/1時間前） ---
-            try:
-                schedule_task_reminders(channel, ts, d)
-                client_slack.chat_postMessage(channel=channel, thread_ts=ts, text="⏰ タスクのリマインドをスケジュールしました。")
-            except Exception as e:
-                print(f"[Slack] reminder schedule failed: {e}")
+            # --- PDF化・送信などの後続処理はバックグラウンドで実行し、Slackへ即時応答 ---
+            background.add_task(run_approval_pipeline, draft_id, d, channel, ts)
             return {"ok": True}
 
     # --- モーダル保存 ---
@@ -1374,11 +1972,26 @@ async def slack_actions(request: Request, x_slack_signature: str = Header(defaul
             purpose=state.get("purpose", {}).get("inp", {}).get("value", ""),
             risks=state.get("risks", {}).get("inp", {}).get("value", ""),
         )
-        save_json(SUMM_DIR / f"{draft_id}.json", updated.dict())
+        await asyncio.to_thread(save_json, SUMM_DIR / f"{draft_id}.json", updated.model_dump())
         meta = DRAFT_META.get(draft_id, {})
         channel, ts = meta.get("channel"), meta.get("ts")
         if channel and ts:
-            client_slack.chat_update(channel=channel, ts=ts, text="下書きを更新しました", blocks=build_minutes_preview_blocks(draft_id, updated))
+            background.add_task(client_slack.chat_update, channel=channel, ts=ts, text="下書きを更新しました", blocks=build_minutes_preview_blocks(draft_id, updated))
         return JSONResponse({"response_action": "clear"})
 
-    return {"ok": True}
\ No newline at end of file
+    return {"ok": True}
+
+def complete_task_and_update_slack(draft_id: str, task_index: str, channel: Optional[str], message_ts: Optional[str]):
+    """
+    タスクを完了状態にマークし、Slackのタスク一覧メッセージを更新（バックグラウンド実行用）
+    task_index: ボタンのvalueから取り出した文字列のインデックス
+    """
+    try:
+        # タスクサービスを使用してタスクを完了状態にマーク
+        task_d, updated_blocks = mark_task_complete(draft_id, int(task_index))
+        if task_d and updated_blocks and channel and message_ts:
+            # メッセージを更新して完了状態を表示
+            # 連続したクリックによる更新は1回の chat.update にまとめる
+            update_task_block_in_slack(channel, message_ts, updated_blocks, debounce=True)
+    except (ValueError, IndexError) as e:
+        task_logger.error(f"Error processing task complete: {e}")
@@ -0,0 +1,44 @@
+"""
+下書きサービスモジュール
+議事録下書き（Draft）の読み込みとキャッシュを提供
+"""
+from functools import lru_cache
+
+import orjson
+
+# Azure App Service環境とローカル開発環境の両方に対応
+try:
+    from app.config import SUMM_DIR
+    from app.models import Draft
+except ImportError:
+    from config import SUMM_DIR
+    from models import Draft
+
+
+@lru_cache(maxsize=512)
+def _load_draft_cached(draft_id: str, mtime_ns: int, size: int) -> Draft:
+    """
+    ファイルの更新時刻とサイズをキーに含めてDraftをキャッシュ（更新されれば自動的に再読み込み）
+    （タイムスタンプ精度の粗いファイルシステムで同一時刻内に書き換えられても、サイズが変われば検出）
+    保存済みJSONは save_json で自ら書き出した検証済みデータのため、再検証せずに構築する
+    """
+    data = orjson.loads((SUMM_DIR / f"{draft_id}.json").read_bytes())
+    return Draft.model_construct(**data)
+
+
+def load_draft(draft_id: str) -> Draft:
+    """
+    下書きIDからDraftを読み込む（キャッシュあり）
+    ディスク上のJSONは本アプリが save_json で書き出したものとして信頼し、pydanticの検証は行わない
+    
+    Args:
+        draft_id: 下書きID
+        
+    Returns:
+        Draftモデル（キャッシュ共有のため、呼び出し側で変更しないこと）
+        
+    Raises:
+        FileNotFoundError: 下書きファイルが存在しない場合
+    """
+    st = (SUMM_DIR / f"{draft_id}.json").stat()
+    return _load_draft_cached(draft_id, st.st_mtime_ns, st.st_size)
@@ -2,19 +2,76 @@
 OpenAIサービスモジュール
 Whisper文字起こしとGPT要約機能を提供
 """
+import asyncio
 import json
+import re
+import shutil
+import tempfile
 from pathlib import Path
 from typing import Optional
 
 # Azure App Service環境とローカル開発環境の両方に対応
 try:
-    from app.config import client_oa
+    from app.config import client_oa, client_oa_async, SUMMARY_MAX_CHARS
     from app.models import Draft
 except ImportError:
-    from config import client_oa
+    from config import client_oa, client_oa_async, SUMMARY_MAX_CHARS
     from models import Draft
 
 
+# 要約用のシステムプロンプト（呼び出しごとに組み立てずモジュールで1回だけ生成）
+_SYSTEM_PROMPT = """You are a meeting minutes assistant. Analyze the transcript and return JSON with the following structure:
+    
+    Required fields (extract from transcript or infer):
+    - meeting_name: Meeting title or topic (extract if mentioned, otherwise use first few sentences)
+    - datetime_str: Date and time if available in transcript, otherwise leave empty
+    - participants: List of participants mentioned (convert to string: "name1, name2, ...")
+    - purpose: Meeting purpose or agenda
+    - summary: Overall summary of the meeting (important - this should be a comprehensive paragraph)
+    - decisions: Decisions made during the meeting (use bullet points with "・" prefix for multiple items)
+    - actions: Action items extracted from transcript - MUST identify tasks mentioned even if assignee/date not specified. 
+      Format each as: "・task_description（担当：person_name、期限：estimated_date）"
+      If no assignee mentioned, infer from context or use "担当：未定"
+      If no date mentioned, estimate reasonable deadline or use "期限：未定"
+    - issues: Open issues or concerns that remain unresolved (use bullet points with "・" prefix)
+    - risks: Identified risks, challenges, or potential problems (use bullet points with "・" prefix)
+    
+    CRITICAL:
+    - You MUST extract actions from the transcript even if not explicitly stated as "action items"
+    - Look for phrases like "next steps", "we should", "need to", "will do", etc.
+    - Always populate actions field - if nothing specific, at least extract implicit tasks from the summary
+    - risks field must be populated - identify any potential problems, challenges, or concerns mentioned
+    
+    Return ALL fields as strings. For multi-line content, use newline characters."""
+_SYSTEM_MESSAGE = {"role": "system", "content": _SYSTEM_PROMPT}
+# GPT応答のコードブロック（```json ... ```）の中身を取り出す（閉じフェンスがなければ末尾まで）
+_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)\s*(?:```|\Z)", re.S | re.I)
+
+
+def _coerce(x, bullet: bool) -> str:
+    """
+    GPTの応答値を文字列に変換（1回の型判定で処理）
+    bullet=True: リスト・辞書を「・」付きの箇条書きに変換
+    bullet=False: Noneは空文字、リストはカンマ区切りに変換
+    """
+    t = type(x)
+    if t is str:
+        return x
+    if t is list or isinstance(x, list):
+        if bullet:
+            return "\n".join(map("・{}".format, x))
+        return ", ".join(map(str, x))
+    if bullet and isinstance(x, dict):
+        if 'action' in x and 'responsible' in x:
+            return f"・{x['action']}（担当：{x['responsible']}）"
+        elif 'action' in x:
+            return f"・{x['action']}"
+        return "\n".join([f"・{k}: {v}" for k, v in x.items()])
+    if x is None and not bullet:
+        return ""
+    return str(x)
+
+
 def transcribe_audio(file_path: Path) -> str:
     """
     Whisperで音声ファイルを文字起こし
@@ -33,58 +90,128 @@ def transcribe_audio(file_path: Path) -> str:
     return getattr(result, "text", "") or result.__dict__.get("text", "")
 
 
-def summarize_to_structured(text: str) -> Draft:
+# このサイズ以上の音声は ffmpeg で分割し、Whisperへ並列に送信する（ffmpeg がない環境では一括送信）
+AUDIO_SPLIT_MIN_BYTES = 8 * 1024 * 1024
+# 分割時の1チャンクの長さ（秒）
+AUDIO_CHUNK_SECONDS = 300
+# Whisperへの同時リクエスト数（レート制限を考慮）
+WHISPER_CONCURRENCY = 4
+
+
+async def _transcribe_file_async(file_path: Path) -> str:
+    """1ファイルをWhisperで文字起こし（非同期クライアント）"""
+    with file_path.open("rb") as f:
+        result = await client_oa_async.audio.transcriptions.create(
+            model="whisper-1",
+            file=f
+        )
+    return getattr(result, "text", "") or result.__dict__.get("text", "")
+
+
+async def _split_audio(file_path: Path, out_dir: Path) -> list:
     """
-    GPTで文字起こしテキストを構造化された議事録に要約
+    ffmpeg で音声を再エンコードせずに一定時間ごとのチャンクへ分割
+    
+    Returns:
+        チャンクファイルのパス（順序どおり）。分割できなかった場合は空リスト
+    """
+    proc = await asyncio.create_subprocess_exec(
+        "ffmpeg", "-nostdin", "-loglevel", "error", "-i", str(file_path),
+        "-f", "segment", "-segment_time", str(AUDIO_CHUNK_SECONDS), "-c", "copy",
+        str(out_dir / f"chunk_%03d{file_path.suffix}"),
+        stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE,
+    )
+    _, stderr = await proc.communicate()
+    if proc.returncode != 0:
+        print(f"⚠️ 音声の分割に失敗したため一括で文字起こしします: {stderr.decode(errors='replace').strip()}")
+        return []
+    return sorted(out_dir.glob(f"chunk_*{file_path.suffix}"))
+
+
+async def transcribe_audio_async(file_path: Path) -> str:
+    """
+    Whisperで音声ファイルを文字起こし（非同期クライアント版、待機中にスレッドを占有しない）
+    長い音声は ffmpeg でチャンクに分割し、並列に文字起こしして順に連結する
     
     Args:
-        text: 文字起こしテキスト
+        file_path: 音声ファイルのパス
         
     Returns:
-        構造化された議事録（Draftモデル）
+        文字起こしされたテキスト
     """
-    system_prompt = """You are a meeting minutes assistant. Analyze the transcript and return JSON with the following structure:
+    if file_path.stat().st_size < AUDIO_SPLIT_MIN_BYTES or not shutil.which("ffmpeg"):
+        return await _transcribe_file_async(file_path)
     
-    Required fields (extract from transcript or infer):
-    - meeting_name: Meeting title or topic (extract if mentioned, otherwise use first few sentences)
-    - datetime_str: Date and time if available in transcript, otherwise leave empty
-    - participants: List of participants mentioned (convert to string: "name1, name2, ...")
-    - purpose: Meeting purpose or agenda
-    - summary: Overall summary of the meeting (important - this should be a comprehensive paragraph)
-    - decisions: Decisions made during the meeting (use bullet points with "・" prefix for multiple items)
-    - actions: Action items extracted from transcript - MUST identify tasks mentioned even if assignee/date not specified. 
-      Format each as: "・task_description（担当：person_name、期限：estimated_date）"
-      If no assignee mentioned, infer from context or use "担当：未定"
-      If no date mentioned, estimate reasonable deadline or use "期限：未定"
-    - issues: Open issues or concerns that remain unresolved (use bullet points with "・" prefix)
-    - risks: Identified risks, challenges, or potential problems (use bullet points with "・" prefix)
-    
-    CRITICAL:
-    - You MUST extract actions from the transcript even if not explicitly stated as "action items"
-    - Look for phrases like "next steps", "we should", "need to", "will do", etc.
-    - Always populate actions field - if nothing specific, at least extract implicit tasks from the summary
-    - risks field must be populated - identify any potential problems, challenges, or concerns mentioned
-    
-    Return ALL fields as strings. For multi-line content, use newline characters."""
+    with tempfile.TemporaryDirectory(prefix="whisper_") as tmp:
+        chunks = await _split_audio(file_path, Path(tmp))
+        if len(chunks) <= 1:
+            return await _transcribe_file_async(file_path)
+        
+        sem = asyncio.Semaphore(WHISPER_CONCURRENCY)
+        
+        async def _transcribe_chunk(chunk: Path) -> str:
+            async with sem:
+                return await _transcribe_file_async(chunk)
+        
+        texts = await asyncio.gather(*(_transcribe_chunk(c) for c in chunks))
+    return "\n".join(t for t in texts if t)
+
+
+def _summary_messages(text: str) -> list:
+    """要約リクエストのメッセージを組み立てる（長すぎる文字起こしは切り詰める）"""
+    # 長すぎる文字起こしはモデルの入力上限・コストを考慮して切り詰める
+    if len(text) > SUMMARY_MAX_CHARS:
+        print(f"⚠️ 文字起こしが長いため先頭{SUMMARY_MAX_CHARS}文字のみ要約します（全{len(text)}文字）")
+        text = text[:SUMMARY_MAX_CHARS]
     
     user_prompt = f"以下は会議の文字起こしです。日本語で要約してください。\n---\n{text}"
+    return [_SYSTEM_MESSAGE, {"role": "user", "content": user_prompt}]
+
+
+def summarize_to_structured(text: str) -> Draft:
+    """
+    GPTで文字起こしテキストを構造化された議事録に要約
     
+    Args:
+        text: 文字起こしテキスト
+        
+    Returns:
+        構造化された議事録（Draftモデル）
+    """
     resp = client_oa.chat.completions.create(
         model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ],
+        messages=_summary_messages(text),
         temperature=0.2,
     )
+    return _parse_summary(resp.choices[0].message.content)
+
+
+async def summarize_to_structured_async(text: str) -> Draft:
+    """
+    GPTで文字起こしテキストを構造化された議事録に要約（非同期クライアント版）
     
-    content = resp.choices[0].message.content.strip()
+    Args:
+        text: 文字起こしテキスト
+        
+    Returns:
+        構造化された議事録（Draftモデル）
+    """
+    resp = await client_oa_async.chat.completions.create(
+        model="gpt-4o-mini",
+        messages=_summary_messages(text),
+        temperature=0.2,
+    )
+    return _parse_summary(resp.choices[0].message.content)
+
+
+def _parse_summary(content: str) -> Draft:
+    """GPTの応答（JSON）をDraftに変換"""
+    content = content.strip()
     
     # JSONコードブロックを除去
-    if "```" in content:
-        content = content.split("```")[1]
-        if content.strip().startswith("json"):
-            content = content.split("\n", 1)[1]
+    m = _FENCE_RE.search(content)
+    if m:
+        content = m.group(1)
     
     # JSONをパース
     try:
@@ -104,48 +231,26 @@ def summarize_to_structured(text: str) -> Draft:
             risks=""
         )
     
-    # データ正規化用のヘルパー関数
-    def _norm(x):
-        """データを正規化（リスト、辞書、その他を適切な形式に変換）"""
-        if isinstance(x, list):
-            return "\n".join([f"・{i}" for i in x])
-        elif isinstance(x, dict):
-            if 'action' in x and 'responsible' in x:
-                return f"・{x['action']}（担当：{x['responsible']}）"
-            elif 'action' in x:
-                return f"・{x['action']}"
-            else:
-                return "\n".join([f"・{k}: {v}" for k, v in x.items()])
-        return str(x)
-    
-    def _to_str(x):
-        """データを文字列に変換"""
-        if x is None:
-            return ""
-        if isinstance(x, list):
-            return ", ".join(str(i) for i in x)
-        return str(x)
-    
     # アクションが空の場合は警告メッセージを設定
-    actions_text = _norm(data.get("actions", ""))
+    actions_text = _coerce(data.get("actions", ""), bullet=True)
     if not actions_text or actions_text.strip() == "":
         actions_text = "アクションアイテムが特定できませんでした"
     
     # リスクが空の場合はデフォルトメッセージを設定
-    risks_text = _norm(data.get("risks", ""))
+    risks_text = _coerce(data.get("risks", ""), bullet=True)
     if not risks_text or risks_text.strip() == "":
         risks_text = "特になし"
     
     return Draft(
         title="",
-        summary=_norm(data.get("summary", "")),
-        decisions=_norm(data.get("decisions", "")),
+        summary=_coerce(data.get("summary", ""), bullet=True),
+        decisions=_coerce(data.get("decisions", ""), bullet=True),
         actions=actions_text,
-        issues=_norm(data.get("issues", "")),
-        meeting_name=_to_str(data.get("meeting_name")),
-        datetime_str=_to_str(data.get("datetime_str")),
-        participants=_to_str(data.get("participants")),
-        purpose=_to_str(data.get("purpose")),
+        issues=_coerce(data.get("issues", ""), bullet=True),
+        meeting_name=_coerce(data.get("meeting_name"), bullet=False),
+        datetime_str=_coerce(data.get("datetime_str"), bullet=False),
+        participants=_coerce(data.get("participants"), bullet=False),
+        purpose=_coerce(data.get("purpose"), bullet=False),
         risks=risks_text,
     )
 
@@ -4,8 +4,8 @@ Slack関連の機能（投稿、ブロック生成、署名検証など）を提
 """
 import time
 import hmac
-import hashlib
 import re
+from functools import lru_cache
 from typing import Optional
 from fastapi import HTTPException
 
@@ -13,11 +13,18 @@ from fastapi import HTTPException
 try:
     from app.config import client_slack, SLACK_SIGNING_SECRET, DEFAULT_SLACK_CHANNEL
     from app.models import Draft
+    from app.utils.logging_utils import get_logger
 except ImportError:
     from config import client_slack, SLACK_SIGNING_SECRET, DEFAULT_SLACK_CHANNEL
     from models import Draft
+    from utils.logging_utils import get_logger
 
 
+logger = get_logger("Slack")
+
+# 署名検証用のシークレット（リクエストごとにエンコードしないよう一度だけ変換）
+_SLACK_SIGNING_SECRET_BYTES = SLACK_SIGNING_SECRET.encode()
+
 # DRAFT_METAはmain.pyで管理（グローバル変数として共有）
 # このモジュールからは参照のみ（モジュール外から設定される）
 
@@ -32,21 +39,57 @@ def verify_slack_signature(body: bytes, timestamp: str, signature: str):
     """
     if not SLACK_SIGNING_SECRET:
         return
-    # 5分以内チェック
+    # 5分以内チェック（整数秒のみで比較）
     try:
-        if abs(time.time() - int(timestamp)) > 60*5:
-            raise HTTPException(status_code=401, detail="Slack timestamp expired")
-    except Exception:
+        ts = int(timestamp)
+    except (ValueError, TypeError):
         raise HTTPException(status_code=401, detail="Slack timestamp invalid")
-    basestring = f"v0:{timestamp}:{body.decode()}".encode()
-    my_sig = "v0=" + hmac.new(SLACK_SIGNING_SECRET.encode(), basestring, hashlib.sha256).hexdigest()
+    if abs(time.time_ns() // 1_000_000_000 - ts) > 60*5:
+        raise HTTPException(status_code=401, detail="Slack timestamp expired")
+    # 本文はデコードせずバイト列のまま連結し、OpenSSLのワンショットHMAC（hmac.digest）で計算
+    # （SHA-256はOpenSSLのC実装で計算されるため、Python側での独自実装やJIT化は不要）
+    basestring = b"v0:" + timestamp.encode() + b":" + body
+    my_sig = "v0=" + hmac.digest(_SLACK_SIGNING_SECRET_BYTES, basestring, "sha256").hex()
     if not hmac.compare_digest(my_sig, signature):
         raise HTTPException(status_code=401, detail="Slack signature invalid")
 
 
-def build_minutes_preview_blocks(draft_id: str, d: Draft):
+# --- ブロックの固定部分（呼び出しごとに組み立てず共有する。生成結果は変更しないこと） ---
+_PREVIEW_HEADER = {"type":"header","text":{"type":"plain_text","text":"議事録ボット"}}
+_DIVIDER = {"type":"divider"}
+# プレビュー本文のセクション（ラベル, Draftの属性名）
+_PREVIEW_BODY_FIELDS = (("サマリー", "summary"), ("決定事項", "decisions"), ("未決定事項", "issues"))
+# 内容がある場合のみ表示するセクション
+_PREVIEW_OPTIONAL_FIELDS = (("アクション", "actions"), ("リスク", "risks"))
+
+_EDIT_MODAL_TITLE = {"type": "plain_text", "text": "議事録 編集"}
+_EDIT_MODAL_SUBMIT = {"type": "plain_text", "text": "保存"}
+_EDIT_MODAL_CLOSE = {"type": "plain_text", "text": "キャンセル"}
+# 編集モーダルの入力欄（block_id=Draftの属性名, ラベル, 複数行入力か）
+_EDIT_MODAL_FIELDS = tuple(
+    (block_id, {"type":"plain_text","text":label}, multiline)
+    for block_id, label, multiline in (
+        ("meeting_name", "会議名", False),
+        ("datetime_str", "日時", False),
+        ("participants", "参加者", False),
+        ("purpose", "目的", True),
+        ("summary", "サマリー", True),
+        ("decisions", "決定事項", True),
+        ("issues", "未決定事項", True),
+        ("actions", "アクション", True),
+        ("risks", "リスク", True),
+    )
+)
+
+
+def _md_section(label: str, text: str) -> dict:
+    """ラベル付きのmrkdwnセクション"""
+    return {"type":"section","text":{"type":"mrkdwn","text":f"*{label}*\n{text or '-'}"}}
+
+
+def _build_minutes_preview_blocks(draft_id: str, d: Draft):
     """
-    議事録プレビュー用のSlackブロックを生成
+    議事録プレビュー用のSlackブロックを生成（キャッシュなし）
     
     Args:
         draft_id: 下書きID
@@ -55,48 +98,39 @@ def build_minutes_preview_blocks(draft_id: str, d: Draft):
     Returns:
         Slackブロックのリスト
     """
-    def md_section(label, text):
-        return {"type":"section","text":{"type":"mrkdwn","text":f"*{label}*\n{text or '-'}"}}
-
     # 議事録名を最大10文字に制限
     meeting_name_display = d.meeting_name or d.title or '（無題）'
     if len(meeting_name_display) > 10:
         meeting_name_display = meeting_name_display[:10] + "..."
     
-    head = [
-        {"type":"header","text":{"type":"plain_text","text":"議事録ボット"}},
+    blocks = [
+        _PREVIEW_HEADER,
         {"type":"section","fields":[
             {"type":"mrkdwn","text":f"*会議名:*\n{meeting_name_display}"},
             {"type":"mrkdwn","text":f"*日時:*\n{d.datetime_str or '-'}"},
             {"type":"mrkdwn","text":f"*参加者:*\n{d.participants or '-'}"},
             {"type":"mrkdwn","text":f"*目的:*\n{d.purpose or '-'}"},
         ]},
-        {"type":"divider"},
+        _DIVIDER,
     ]
-    body = [
-        md_section("サマリー", d.summary),
-        md_section("決定事項", d.decisions),
-        md_section("未決定事項", d.issues),
+    blocks += [_md_section(label, getattr(d, attr)) for label, attr in _PREVIEW_BODY_FIELDS]
+    # アクション（タスクリスト）・リスク欄（任意）を追加
+    blocks += [
+        _md_section(label, getattr(d, attr))
+        for label, attr in _PREVIEW_OPTIONAL_FIELDS if (getattr(d, attr) or "").strip()
     ]
-    # アクション（タスクリスト）を追加
-    if (d.actions or "").strip():
-        body += [md_section("アクション", d.actions)]
-    # リスク欄（任意）
-    if (d.risks or "").strip():
-        body += [md_section("リスク", d.risks)]
-
-    tail = [
+    blocks.append(
         {"type":"actions","elements":[
             {"type":"button","text":{"type":"plain_text","text":"編集"},"action_id":"edit","value":draft_id},
             {"type":"button","text":{"type":"plain_text","text":"承認"},"style":"primary","action_id":"approve","value":draft_id},
         ]}
-    ]
-    return head + body + tail
+    )
+    return blocks
 
 
-def build_edit_modal(draft_id: str, d: Draft):
+def _build_edit_modal(draft_id: str, d: Draft):
     """
-    議事録編集用のSlackモーダルを生成
+    議事録編集用のSlackモーダルを生成（キャッシュなし）
     
     Args:
         draft_id: 下書きID
@@ -105,117 +139,202 @@ def build_edit_modal(draft_id: str, d: Draft):
     Returns:
         Slackモーダルの設定辞書
     """
+    blocks = []
+    for block_id, label, multiline in _EDIT_MODAL_FIELDS:
+        element = {"type":"plain_text_input","action_id":"inp"}
+        if multiline:
+            element["multiline"] = True
+        element["initial_value"] = getattr(d, block_id) or ""
+        blocks.append({"type":"input","block_id":block_id,"label":label,"element":element})
     return {
         "type": "modal",
         "callback_id": "edit_submit",
         "private_metadata": draft_id,
-        "title": {"type": "plain_text", "text": "議事録 編集"},
-        "submit": {"type": "plain_text", "text": "保存"},
-        "close": {"type": "plain_text", "text": "キャンセル"},
-        "blocks": [
-            {"type":"input","block_id":"meeting_name","label":{"type":"plain_text","text":"会議名"},
-             "element":{"type":"plain_text_input","action_id":"inp","initial_value":d.meeting_name or ""}},
-            {"type":"input","block_id":"datetime_str","label":{"type":"plain_text","text":"日時"},
-             "element":{"type":"plain_text_input","action_id":"inp","initial_value":d.datetime_str or ""}},
-            {"type":"input","block_id":"participants","label":{"type":"plain_text","text":"参加者"},
-             "element":{"type":"plain_text_input","action_id":"inp","initial_value":d.participants or ""}},
-            {"type":"input","block_id":"purpose","label":{"type":"plain_text","text":"目的"},
-             "element":{"type":"plain_text_input","action_id":"inp","multiline":True,"initial_value":d.purpose or ""}},
-            {"type":"input","block_id":"summary","label":{"type":"plain_text","text":"サマリー"},
-             "element":{"type":"plain_text_input","action_id":"inp","multiline":True,"initial_value":d.summary}},
-            {"type":"input","block_id":"decisions","label":{"type":"plain_text","text":"決定事項"},
-             "element":{"type":"plain_text_input","action_id":"inp","multiline":True,"initial_value":d.decisions}},
-            {"type":"input","block_id":"issues","label":{"type":"plain_text","text":"未決定事項"},
-             "element":{"type":"plain_text_input","action_id":"inp","multiline":True,"initial_value":d.issues}},
-            {"type":"input","block_id":"actions","label":{"type":"plain_text","text":"アクション"},
-             "element":{"type":"plain_text_input","action_id":"inp","multiline":True,"initial_value":d.actions}},
-            {"type":"input","block_id":"risks","label":{"type":"plain_text","text":"リスク"},
-             "element":{"type":"plain_text_input","action_id":"inp","multiline":True,"initial_value":d.risks or ""}},
-        ]
+        "title": _EDIT_MODAL_TITLE,
+        "submit": _EDIT_MODAL_SUBMIT,
+        "close": _EDIT_MODAL_CLOSE,
+        "blocks": blocks,
     }
 
 
+# アクション文字列の担当者・期限の抽出用（モジュール読み込み時に一度だけコンパイル）
+_ASSIGNEE_RE = re.compile(r"（担当：([^）]+)）")
+_DUE_RE = re.compile(r"（期限：([^）]+)）")
+# 担当者・期限の記載をまとめて除去（1回の走査でタスク名だけを残す）
+_TAGS_RE = re.compile(r"（(?:担当|期限)：[^）]+）")
+
+
 def parse_tasks_from_actions(actions_text: str):
     """
     アクション文字列からタスク配列へ軽量パース
+    （同じアクション文字列は一度だけパースし、タスク完了・ブロック生成・リマインドで結果を共有）
     
     Args:
         actions_text: アクション文字列（例：「・タスクA（担当：田中、期限：10/25）」）
         
     Returns:
-        タスクのリスト（各タスクは {"title": str, "assignee": Optional[str], "due": Optional[str]}）
+        タスクのリスト（各タスクは {"title": str, "assignee": Optional[str], "due": Optional[str]}、
+        タスクの辞書はキャッシュと共有のため変更しないこと）
     """
+    return list(_parse_tasks_cached(actions_text or ""))
+
+
+@lru_cache(maxsize=256)
+def _parse_tasks_cached(actions_text: str) -> tuple:
     tasks = []
-    for raw in (actions_text or "").splitlines():
+    for raw in actions_text.splitlines():
         item = raw.lstrip("・").strip()
         if not item: continue
         # （担当：○○）, （期限：10/25） を抜く
-        assignee = None
-        due = None
-        m1 = re.search(r"（担当：([^）]+)）", item)
-        if m1: assignee = m1.group(1); item = item.replace(m1.group(0), "").strip()
-        m2 = re.search(r"（期限：([^）]+)）", item)
-        if m2: due = m2.group(1); item = item.replace(m2.group(0), "").strip()
+        m1 = _ASSIGNEE_RE.search(item)
+        assignee = m1.group(1) if m1 else None
+        m2 = _DUE_RE.search(item)
+        due = m2.group(1) if m2 else None
+        if m1 or m2:
+            item = _TAGS_RE.sub("", item).strip()
         tasks.append({"title": item, "assignee": assignee, "due": due})
-    return tasks
+    return tuple(tasks)
+
 
+_NO_TASKS_BLOCK = {"type":"section","text":{"type":"mrkdwn","text":"アクションアイテムは登録されていません。"}}
+_TASKS_HEADER = {"type":"header","text":{"type":"plain_text","text":"✅ アクションアイテム＆タスク"}}
 
-def build_tasks_blocks(d: Draft, draft_id: str = ""):
+
+def _task_block(t: dict, task_value: str, completed: bool) -> dict:
+    """
+    1タスク分のチェックボックス付きセクションブロックを生成
+    （完了済みはチェック済み・ボタン無効で表示）
     """
-    タスクのSlackブロックを生成（画像2の「アクションアイテム&タスク」風）
+    if completed:
+        text = f"☑ {t['title']}"
+        accessory = {
+            "type": "button",
+            "text": {"type": "plain_text", "text": "完了済み"},
+            "style": "primary",
+            "value": task_value,
+            "action_id": "task_complete",
+            "disabled": True
+        }
+    else:
+        text = f"☐ {t['title']}"
+        accessory = {
+            "type": "button",
+            "text": {"type": "plain_text", "text": "完了"},
+            "value": task_value,
+            "action_id": "task_complete",
+        }
+    block = {"type": "section", "text": {"type": "mrkdwn", "text": text}}
+    # 担当者と期限のフィールド
+    fields = []
+    if t["assignee"]:
+        fields.append({"type":"mrkdwn","text":f"*担当:*\n{t['assignee']}"})
+    if t["due"]:
+        fields.append({"type":"mrkdwn","text":f"*期限:*\n{t['due']}"})
+    if fields:
+        block["fields"] = fields
+    block["accessory"] = accessory
+    return block
+
+
+def _build_tasks_blocks(d: Draft, draft_id: str = "", completed_index: Optional[int] = None):
+    """
+    タスクのSlackブロックを生成（画像2の「アクションアイテム&タスク」風、キャッシュなし）
     
     Args:
         d: Draftモデル
         draft_id: 下書きID（オプション）
+        completed_index: 完了済みとして表示するタスクのインデックス（オプション）
         
     Returns:
-        Slackブロックのリスト
+        Slackブロックのリスト（タスクiのブロックは blocks[i + 1]）
     """
+    # アクションが空ならパースせずに返す
+    if not (d.actions or "").strip():
+        return [_NO_TASKS_BLOCK]
     tasks = parse_tasks_from_actions(d.actions)
     if not tasks:
-        return [{"type":"section","text":{"type":"mrkdwn","text":"アクションアイテムは登録されていません。"}}]
+        return [_NO_TASKS_BLOCK]
     
     # 各タスクを個別のセクションブロックとして表示
-    blocks = [
-        {"type":"header","text":{"type":"plain_text","text":"✅ アクションアイテム＆タスク"}},
+    return [_TASKS_HEADER] + [
+        _task_block(t, f"{draft_id}:{i}" if draft_id else str(i), i == completed_index)
+        for i, t in enumerate(tasks)
     ]
+
+
+# --- ブロック生成のキャッシュ ---
+# 承認・編集・タスク完了の各操作で同じ内容のDraftからブロックを何度も生成するため、
+# (draft_id, Draftの全フィールド値) をキーに生成結果を再利用する（Draftが編集されればキーが変わる）
+# 返すブロックはキャッシュと共有のため、呼び出し側で変更しないこと
+_DRAFT_FIELDS = tuple(Draft.model_fields)
+
+
+def _draft_key(d: Draft) -> tuple:
+    """Draftの全フィールド値のタプル（キャッシュキー）"""
+    return tuple(getattr(d, f) for f in _DRAFT_FIELDS)
+
+
+def _draft_from_key(key: tuple) -> Draft:
+    """キャッシュキーからDraftを復元"""
+    return Draft.model_construct(**dict(zip(_DRAFT_FIELDS, key)))
+
+
+@lru_cache(maxsize=256)
+def _minutes_preview_blocks_cached(draft_id: str, key: tuple):
+    return _build_minutes_preview_blocks(draft_id, _draft_from_key(key))
+
+
+@lru_cache(maxsize=256)
+def _edit_modal_cached(draft_id: str, key: tuple):
+    return _build_edit_modal(draft_id, _draft_from_key(key))
+
+
+@lru_cache(maxsize=256)
+def _tasks_blocks_cached(key: tuple, draft_id: str, completed_index: Optional[int]):
+    return _build_tasks_blocks(_draft_from_key(key), draft_id, completed_index)
+
+
+def build_minutes_preview_blocks(draft_id: str, d: Draft):
+    """
+    議事録プレビュー用のSlackブロックを生成（同じ内容のDraftはキャッシュを返す）
     
-    for i, t in enumerate(tasks):
-        task_value = f"{draft_id}:{i}" if draft_id else str(i)
-        # 担当者と期限のフィールド
-        fields = []
-        if t.get("assignee"):
-            fields.append({"type":"mrkdwn","text":f"*担当:*\n{t['assignee']}"})
-        if t.get("due"):
-            fields.append({"type":"mrkdwn","text":f"*期限:*\n{t['due']}"})
+    Args:
+        draft_id: 下書きID
+        d: Draftモデル
         
-        # チェックボックス付きセクションブロック
-        text = f"☐ {t['title']}"
-        if fields:
-            blocks.append({
-                "type": "section",
-                "text": {"type": "mrkdwn", "text": text},
-                "fields": fields,
-                "accessory": {
-                    "type": "button",
-                    "text": {"type": "plain_text", "text": "完了"},
-                    "value": task_value,
-                    "action_id": "task_complete",
-                }
-            })
-        else:
-            blocks.append({
-                "type": "section",
-                "text": {"type": "mrkdwn", "text": text},
-                "accessory": {
-                    "type": "button",
-                    "text": {"type": "plain_text", "text": "完了"},
-                    "value": task_value,
-                    "action_id": "task_complete",
-                }
-            })
+    Returns:
+        Slackブロックのリスト（キャッシュ共有のため変更しないこと）
+    """
+    return _minutes_preview_blocks_cached(draft_id, _draft_key(d))
+
+
+def build_edit_modal(draft_id: str, d: Draft):
+    """
+    議事録編集用のSlackモーダルを生成（同じ内容のDraftはキャッシュを返す）
     
-    return blocks
+    Args:
+        draft_id: 下書きID
+        d: Draftモデル
+        
+    Returns:
+        Slackモーダルの設定辞書（キャッシュ共有のため変更しないこと）
+    """
+    return _edit_modal_cached(draft_id, _draft_key(d))
+
+
+def build_tasks_blocks(d: Draft, draft_id: str = "", completed_index: Optional[int] = None):
+    """
+    タスクのSlackブロックを生成（同じ内容のDraftはキャッシュを返す）
+    
+    Args:
+        d: Draftモデル
+        draft_id: 下書きID（オプション）
+        completed_index: 完了済みとして表示するタスクのインデックス（オプション）
+        
+    Returns:
+        Slackブロックのリスト（タスクiのブロックは blocks[i + 1]、キャッシュ共有のため変更しないこと）
+    """
+    return _tasks_blocks_cached(_draft_key(d), draft_id, completed_index)
 
 
 def post_slack_draft(channel_id: str, draft_id: str, title: str, d: Draft, draft_meta: dict):
@@ -234,7 +353,7 @@ def post_slack_draft(channel_id: str, draft_id: str, title: str, d: Draft, draft
     """
     # 重複投稿を防ぐ：既に投稿済みの場合はスキップ
     if draft_id in draft_meta and draft_meta[draft_id].get("ts"):
-        print(f"[Slack] Draft {draft_id} already posted, skipping duplicate")
+        logger.info("Draft %s already posted, skipping duplicate", draft_id)
         return draft_meta[draft_id]
     
     blocks = build_minutes_preview_blocks(draft_id, d)
@@ -243,7 +362,7 @@ def post_slack_draft(channel_id: str, draft_id: str, title: str, d: Draft, draft
         draft_meta[draft_id] = {"channel": channel_id, "ts": resp["ts"]}
         return resp
     except Exception as e:
-        print(f"[Slack] Post draft failed for channel {channel_id}: {e}")
+        logger.error("Post draft failed for channel %s: %s", channel_id, e)
         # channel_idが不正な場合は空のchannel_idを設定してDRAFT_METAに保存
         draft_meta[draft_id] = {"channel": "", "ts": ""}
         raise
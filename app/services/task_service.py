@@ -2,42 +2,49 @@
 タスクサービスモジュール
 タスク関連の機能（完了処理、リマインドなど）を提供
 """
-import json
+import hashlib
 import re
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Optional, Tuple
 from datetime import datetime, timedelta
 
+import orjson
+
 # Azure App Service環境とローカル開発環境の両方に対応
 try:
     from app.config import (
         client_slack, DEFAULT_REMIND_HOUR, SLACK_USER_MAP_JSON,
-        SUMM_DIR, DEFAULT_SLACK_CHANNEL
+        SUMM_DIR, DEFAULT_SLACK_CHANNEL, JST
     )
     from app.models import Draft
+    from app.utils.logging_utils import get_logger
     from app.services.slack_service import parse_tasks_from_actions, build_tasks_blocks
+    from app.services.draft_service import load_draft
 except ImportError:
     from config import (
         client_slack, DEFAULT_REMIND_HOUR, SLACK_USER_MAP_JSON,
-        SUMM_DIR, DEFAULT_SLACK_CHANNEL
+        SUMM_DIR, DEFAULT_SLACK_CHANNEL, JST
     )
     from models import Draft
+    from utils.logging_utils import get_logger
     from services.slack_service import parse_tasks_from_actions, build_tasks_blocks
+    from services.draft_service import load_draft
 
 from slack_sdk.errors import SlackApiError
 
-try:
-    from zoneinfo import ZoneInfo  # Python 3.9+
-except Exception:
-    ZoneInfo = None
 
+slack_logger = get_logger("Slack")
+task_logger = get_logger("Task")
 
-def _tz():
-    """JST固定（必要なら環境変数で切替）"""
-    if ZoneInfo:
-        return ZoneInfo("Asia/Tokyo")
-    # フォールバック：naive扱い
-    return None
+
+# 期限表記: 'YYYY-MM-DD[ HH:MM]' / 'YYYY/MM/DD[ HH:MM]'（区切りは統一）または 'MM/DD'（年なし）
+_DUE_RE = re.compile(
+    r"(\d{4})([-/])(\d{1,2})\2(\d{1,2})(?:\s+(\d{1,2}):(\d{1,2}))?"
+    r"|(\d{1,2})/(\d{1,2})"
+)
 
 
 def _parse_due_to_dt(due_str: Optional[str]) -> Optional[datetime]:
@@ -47,31 +54,30 @@ def _parse_due_to_dt(due_str: Optional[str]) -> Optional[datetime]:
     """
     if not due_str:
         return None
-    s = due_str.strip()
-    # よくある表記を順にトライ
-    fmt_candidates = [
-        "%Y-%m-%d %H:%M", "%Y/%m/%d %H:%M",
-        "%Y-%m-%d", "%Y/%m/%d",
-        "%m/%d",  # 年なし（今年扱い）
-    ]
-    now = datetime.now(_tz())
-    for fmt in fmt_candidates:
-        try:
-            dt = datetime.strptime(s, fmt)
-            # 年なし → 今年
-            if fmt == "%m/%d":
-                dt = dt.replace(year=now.year)
-            # 時刻なければデフォ時刻
-            if fmt in ("%Y-%m-%d", "%Y/%m/%d", "%m/%d"):
-                dt = dt.replace(hour=DEFAULT_REMIND_HOUR, minute=0)
-            # タイムゾーン付与
-            if _tz():
-                if dt.tzinfo is None:
-                    dt = dt.replace(tzinfo=_tz())
-            return dt
-        except ValueError:
-            continue
-    return None
+    due_str = due_str.strip()
+    # 「未定」「来週」など数字で始まらない表記は正規表現を通さずに除外
+    if not due_str[:1].isdigit():
+        return None
+    m = _DUE_RE.fullmatch(due_str)
+    if not m:
+        return None
+    year, _, month, day, hour, minute, short_month, short_day = m.groups()
+    if year is None:
+        # 年なし → 今年
+        year, month, day = datetime.now(JST).year, short_month, short_day
+    try:
+        # 時刻なければデフォ時刻
+        dt = datetime(
+            int(year), int(month), int(day),
+            int(hour) if hour else DEFAULT_REMIND_HOUR,
+            int(minute) if minute else 0,
+        )
+    except ValueError:
+        return None
+    # タイムゾーン付与
+    if JST:
+        dt = dt.replace(tzinfo=JST)
+    return dt
 
 
 def _epoch(dt: datetime) -> Optional[int]:
@@ -79,28 +85,45 @@ def _epoch(dt: datetime) -> Optional[int]:
     if not dt:
         return None
     # SlackはUTC epoch（秒）
-    if dt.tzinfo is None and _tz():
-        dt = dt.replace(tzinfo=_tz())
+    if dt.tzinfo is None and JST:
+        dt = dt.replace(tzinfo=JST)
     return int(dt.timestamp())
 
 
 def _load_user_map() -> dict:
-    """環境変数からSlackユーザーマップを読み込み"""
+    """環境変数からSlackユーザーマップを読み込み（インポート時に一度だけ呼ばれる）"""
     try:
-        return json.loads(SLACK_USER_MAP_JSON) if SLACK_USER_MAP_JSON else {}
-    except Exception:
+        return orjson.loads(SLACK_USER_MAP_JSON) if SLACK_USER_MAP_JSON else {}
+    except Exception as e:
+        # 一度しか解析しないため、設定ミスは起動時に知らせる
+        task_logger.warning(f"SLACK_USER_MAP_JSON を解析できませんでした: {e}。担当者メンションは付与されません。")
         return {}
 
 
+# リマインド登録（chat.scheduleMessage）の同時送信数
+_SCHEDULE_MAX_WORKERS = 8
+_schedule_executor = ThreadPoolExecutor(max_workers=_SCHEDULE_MAX_WORKERS, thread_name_prefix="slack-schedule")
+# Slackユーザーマップ（環境変数は起動後に変わらないため、インポート時に一度だけ解析）
+_USER_MAP = _load_user_map()
+# 担当者名の括弧書き（役割など）
+_ASSIGNEE_PAREN_RE = re.compile(r"\(.*?\)")
+
+
 def _resolve_slack_user_id(name: Optional[str]) -> Optional[str]:
     """
     '田中(PM)' → '田中' 抜き出し → 環境変数マップで Slack ID に解決。
     """
     if not name:
         return None
-    base = re.sub(r"\(.*?\)", "", name).strip()
-    m = _load_user_map()
-    return m.get(base)
+    base = _ASSIGNEE_PAREN_RE.sub("", name).strip()
+    return _USER_MAP.get(base)
+
+
+@lru_cache(maxsize=256)
+def _mention_prefix(assignee: Optional[str]) -> str:
+    """担当者名からメンションの接頭辞（'<@U...> '、解決できなければ空文字）を取得（ユーザーマップは不変のためキャッシュ）"""
+    uid = _resolve_slack_user_id(assignee)
+    return f"<@{uid}> " if uid else ""
 
 
 def schedule_task_reminders(channel: str, thread_ts: str, d: Draft):
@@ -120,21 +143,20 @@ def schedule_task_reminders(channel: str, thread_ts: str, d: Draft):
         return
 
     # 現在時刻から3分後
-    now = datetime.now(_tz()) if _tz() else datetime.now()
+    now = datetime.now(JST)
     reminder_time = now + timedelta(minutes=3)
     post_at = _epoch(reminder_time)
     
     if not post_at:
         return
 
-    for t in tasks:
-        mention = ""
-        uid = _resolve_slack_user_id(t.get("assignee"))
-        if uid:
-            mention = f"<@{uid}> "
-        text = (f"{mention}🔔 ⏰ リマインド：*{t['title']}* "
-                f"（担当: {t.get('assignee') or '未定'} / 期限: {t.get('due') or '未定'}）")
+    texts = [
+        f"{_mention_prefix(t['assignee'])}🔔 ⏰ リマインド：*{t['title']}* "
+        f"（担当: {t['assignee'] or '未定'} / 期限: {t['due'] or '未定'}）"
+        for t in tasks
+    ]
 
+    def _schedule(text: str):
         try:
             client_slack.chat_scheduleMessage(
                 channel=channel,
@@ -143,7 +165,10 @@ def schedule_task_reminders(channel: str, thread_ts: str, d: Draft):
                 thread_ts=thread_ts
             )
         except SlackApiError as e:
-            print(f"[Slack] scheduleMessage failed: {e}")
+            slack_logger.error("scheduleMessage failed: %s", e)
+
+    # 各タスクのスケジュール登録は独立しているため並行して送信（スレッドは呼び出し間で再利用）
+    list(_schedule_executor.map(_schedule, texts))
 
 
 def mark_task_complete(draft_id: str, task_index: int) -> Tuple[Optional[Draft], Optional[list]]:
@@ -159,57 +184,57 @@ def mark_task_complete(draft_id: str, task_index: int) -> Tuple[Optional[Draft],
     """
     try:
         # draft_idからDraftデータを取得
-        task_draft_data = json.loads((SUMM_DIR / f"{draft_id}.json").read_text(encoding="utf-8"))
-        task_d = Draft(**task_draft_data)
+        task_d = load_draft(draft_id)
         
         # タスクリストを取得
         tasks = parse_tasks_from_actions(task_d.actions)
         if 0 <= task_index < len(tasks):
-            task = tasks[task_index]
-            
-            # タスクリストブロックを更新
-            updated_blocks = build_tasks_blocks(task_d, draft_id)
-            
-            # 該当タスクを完了状態に変更
-            for block in updated_blocks:
-                if block.get("type") == "section":
-                    text = block.get("text", {}).get("text", "")
-                    if f"☐ {task['title']}" in text or task['title'] in text:
-                        # チェックボックスを完了に変更
-                        block["text"]["text"] = text.replace("☐", "☑")
-                        # 完了ボタンを無効化
-                        if "accessory" in block:
-                            task_value = f"{draft_id}:{task_index}"
-                            block["accessory"] = {
-                                "type": "button",
-                                "text": {"type": "plain_text", "text": "完了済み"},
-                                "style": "primary",
-                                "value": task_value,
-                                "action_id": "task_complete",
-                                "disabled": True
-                            }
+            # 該当タスクを完了状態にしたタスクリストブロックを生成（ブロックはタスク順に並ぶため直接指定）
+            # （タイトルの文字列検索を行わないため、タイトルが他タスクの部分文字列でも取り違えない）
+            updated_blocks = build_tasks_blocks(task_d, draft_id, completed_index=task_index)
             
             return task_d, updated_blocks
         else:
-            print(f"[Task] Invalid task index: {task_index} (total tasks: {len(tasks)})")
+            task_logger.warning("Invalid task index: %s (total tasks: %s)", task_index, len(tasks))
             return None, None
     except (ValueError, IndexError, FileNotFoundError) as e:
-        print(f"[Task] Error marking task complete: {e}")
+        task_logger.error("Error marking task complete: %s", e)
         return None, None
 
 
-def update_task_block_in_slack(channel: str, message_ts: str, blocks: list) -> bool:
+# メッセージごとに最後に送信したタスクブロックのハッシュ（同じ内容への更新＝完了ボタンの二度押しなどを省略）
+_LAST_TASK_BLOCKS = {}
+_LAST_TASK_BLOCKS_MAX = 256
+_LAST_TASK_BLOCKS_LOCK = threading.Lock()
+
+
+def _blocks_digest(blocks: list) -> bytes:
+    """ブロックの内容比較用ハッシュ（暗号用途ではないため高速なblake2bの短いダイジェスト）"""
+    return hashlib.blake2b(orjson.dumps(blocks), digest_size=8).digest()
+
+
+def update_task_block_in_slack(channel: str, message_ts: str, blocks: list, debounce: bool = False) -> bool:
     """
     Slackメッセージのタスクブロックを更新
+    直前に同じメッセージへ送信した内容と同一の場合はSlackへのリクエストを省略する
     
     Args:
         channel: SlackチャンネルID
         message_ts: メッセージのタイムスタンプ
         blocks: 更新されたブロック
+        debounce: Trueの場合は即時送信せず、短時間に同じメッセージへ届いた更新をまとめて最新のものだけ送信する
         
     Returns:
-        成功した場合はTrue、失敗した場合はFalse
+        成功した場合（更新不要の場合・送信を予約した場合を含む）はTrue、失敗した場合はFalse
     """
+    key = (channel, message_ts)
+    if debounce:
+        _schedule_task_block_update(key, blocks)
+        return True
+    digest = _blocks_digest(blocks)
+    with _LAST_TASK_BLOCKS_LOCK:
+        if _LAST_TASK_BLOCKS.get(key) == digest:
+            return True
     try:
         client_slack.chat_update(
             channel=channel,
@@ -217,8 +242,43 @@ def update_task_block_in_slack(channel: str, message_ts: str, blocks: list) -> b
             blocks=blocks,
             text="アクションアイテム＆タスク"
         )
+        with _LAST_TASK_BLOCKS_LOCK:
+            _LAST_TASK_BLOCKS.pop(key, None)
+            _LAST_TASK_BLOCKS[key] = digest
+            # 古いものから削除して件数を制限
+            while len(_LAST_TASK_BLOCKS) > _LAST_TASK_BLOCKS_MAX:
+                del _LAST_TASK_BLOCKS[next(iter(_LAST_TASK_BLOCKS))]
         return True
     except Exception as e:
-        print(f"[Slack] Failed to update task block: {e}")
+        slack_logger.error("Failed to update task block: %s", e)
         return False
 
+
+
+# 同じメッセージへの更新をまとめる待ち時間（秒）
+_TASK_UPDATE_DEBOUNCE_SECONDS = 0.5
+# 送信待ちのブロック（(channel, ts) → 最新のブロック）。各更新はメッセージ全体を置き換えるため最新のものだけ送ればよい
+_PENDING_TASK_BLOCKS = {}
+_PENDING_TASK_BLOCKS_LOCK = threading.Lock()
+
+
+def _flush_task_block_update(key: Tuple[str, str]) -> None:
+    """送信待ちの最新ブロックでSlackメッセージを更新"""
+    with _PENDING_TASK_BLOCKS_LOCK:
+        blocks = _PENDING_TASK_BLOCKS.pop(key, None)
+    if blocks is not None:
+        update_task_block_in_slack(key[0], key[1], blocks)
+
+
+def _schedule_task_block_update(key: Tuple[str, str], blocks: list) -> None:
+    """
+    タスクブロックの更新を予約（タスク完了ボタンの連続クリックなど、
+    待ち時間の間に同じメッセージへ届いた更新は最新のブロックだけを1回の chat.update で送信する）
+    """
+    with _PENDING_TASK_BLOCKS_LOCK:
+        already_scheduled = key in _PENDING_TASK_BLOCKS
+        _PENDING_TASK_BLOCKS[key] = blocks
+    if not already_scheduled:
+        timer = threading.Timer(_TASK_UPDATE_DEBOUNCE_SECONDS, _flush_task_block_update, args=(key,))
+        timer.daemon = True
+        timer.start()
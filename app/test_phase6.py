@@ -171,6 +171,37 @@ try:
 except Exception as e:
     print(f"  ⚠ 確認中にエラー: {e}")
 
+# テスト6: Slackアクションの即時応答（ハンドラ内で同期的なSlack API呼び出しをしていないか）
+print("\n[テスト6] /slack/actions の即時応答の確認")
+try:
+    import ast
+    tree = ast.parse(Path("main.py").read_text(encoding="utf-8"))
+    handler = next(
+        node for node in ast.walk(tree)
+        if isinstance(node, ast.AsyncFunctionDef) and node.name == "slack_actions"
+    )
+    blocking_calls = []
+    for node in ast.walk(handler):
+        if not isinstance(node, ast.Call):
+            continue
+        func = node.func
+        # client_slack.xxx(...) の直接呼び出し
+        if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name) and func.value.id == "client_slack":
+            blocking_calls.append(f"client_slack.{func.attr} (line {node.lineno})")
+        # タスク完了処理の直接呼び出し
+        elif isinstance(func, ast.Name) and func.id in ("mark_task_complete", "update_task_block_in_slack"):
+            blocking_calls.append(f"{func.id} (line {node.lineno})")
+    
+    if blocking_calls:
+        for call in blocking_calls:
+            print(f"    ✗ ハンドラ内で同期的に呼び出しています: {call}")
+        print("  ⚠ Slackの3秒以内の応答期限を超える可能性があります")
+    else:
+        print("  ✓ Slack API呼び出しはバックグラウンドタスク/スレッドに委譲されています")
+    
+except Exception as e:
+    print(f"  ⚠ 確認中にエラー: {e}")
+
 print("\n" + "=" * 70)
 print("✓ すべてのテストが成功しました！")
 print("=" * 70)
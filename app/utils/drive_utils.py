@@ -1,3 +1,4 @@
+from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
@@ -5,11 +6,21 @@ from googleapiclient.http import MediaFileUpload
 import os
 
 SCOPES = ["https://www.googleapis.com/auth/drive.file"]
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+UPLOAD_RETRIES = 5
 
-def upload_to_drive(file_path: str, credentials_path: str, folder_id: str):
-    creds = None
+# 認証情報とDriveサービスは一度だけ作成して使い回す（build() のたびにディスカバリ処理が走るのを避ける）
+_CREDS = None
+_SERVICE = None
+
+def _get_service(credentials_path: str):
+    global _CREDS, _SERVICE
+    if _SERVICE is not None and _CREDS is not None and _CREDS.valid:
+        return _SERVICE
+
+    creds = _CREDS
     token_path = "token.json"
-    if os.path.exists(token_path):
+    if creds is None and os.path.exists(token_path):
         creds = Credentials.from_authorized_user_file(token_path, SCOPES)
     if not creds or not creds.valid:
         if creds and creds.expired and creds.refresh_token:
@@ -20,8 +31,17 @@ def upload_to_drive(file_path: str, credentials_path: str, folder_id: str):
         with open(token_path, "w") as token:
             token.write(creds.to_json())
 
-    service = build("drive", "v3", credentials=creds)
+    _CREDS = creds
+    _SERVICE = build("drive", "v3", credentials=creds, cache_discovery=False, static_discovery=True)
+    return _SERVICE
+
+def upload_to_drive(file_path: str, credentials_path: str, folder_id: str):
+    service = _get_service(credentials_path)
     file_metadata = {"name": os.path.basename(file_path), "parents": [folder_id]}
-    media = MediaFileUpload(file_path, mimetype="application/pdf")
-    uploaded_file = service.files().create(body=file_metadata, media_body=media, fields="id").execute()
+    # レジューム可能アップロードでチャンク単位に送信（メモリ使用量は1チャンク分、失敗時はチャンク単位で再試行）
+    media = MediaFileUpload(file_path, mimetype="application/pdf", resumable=True, chunksize=UPLOAD_CHUNK_SIZE)
+    request = service.files().create(body=file_metadata, media_body=media, fields="id")
+    uploaded_file = None
+    while uploaded_file is None:
+        _, uploaded_file = request.next_chunk(num_retries=UPLOAD_RETRIES)
     return uploaded_file.get("id")
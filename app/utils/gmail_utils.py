@@ -1,21 +1,48 @@
 import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from email.mime.application import MIMEApplication
-import os
+import threading
+from email.message import EmailMessage
+from pathlib import Path
+
+# ログイン済みのSMTP接続を送信元ごとに保持し、送信ごとのTLSハンドシェイク・認証を省略する
+_SMTP_CLIENTS = {}
+_SMTP_LOCK = threading.Lock()
+
+def _connect(sender, password):
+    server = smtplib.SMTP_SSL("smtp.gmail.com", 465)
+    server.login(sender, password)
+    _SMTP_CLIENTS[sender] = (password, server)
+    return server
+
+def _smtp_client(sender, password):
+    cached = _SMTP_CLIENTS.get(sender)
+    if cached is not None:
+        cached_password, server = cached
+        if cached_password == password:
+            try:
+                if server.noop()[0] == 250:
+                    return server
+            except smtplib.SMTPException:
+                pass
+        try:
+            server.quit()
+        except Exception:
+            pass
+    return _connect(sender, password)
 
 def send_minutes_via_gmail(sender, password, to, subject, body, attachment_path):
-    msg = MIMEMultipart()
+    msg = EmailMessage()
     msg["From"] = sender
     msg["To"] = to
     msg["Subject"] = subject
 
-    msg.attach(MIMEText(body, "plain", "utf-8"))
-    with open(attachment_path, "rb") as f:
-        part = MIMEApplication(f.read(), Name=os.path.basename(attachment_path))
-        part["Content-Disposition"] = f'attachment; filename="{os.path.basename(attachment_path)}"'
-        msg.attach(part)
+    msg.set_content(body, charset="utf-8")
+    attachment = Path(attachment_path)
+    msg.add_attachment(attachment.read_bytes(), maintype="application", subtype="pdf", filename=attachment.name)
 
-    with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
-        server.login(sender, password)
-        server.send_message(msg)
+    with _SMTP_LOCK:
+        server = _smtp_client(sender, password)
+        try:
+            server.send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            # アイドル中にサーバー側で切断された場合は再接続して1回だけ再送
+            _connect(sender, password).send_message(msg)
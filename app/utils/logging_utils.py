@@ -0,0 +1,51 @@
+"""
+ログユーティリティ
+キュー経由で標準出力へ書き込むロガーを提供（出力は従来のprintと同じ「[名前] メッセージ」形式）
+各スレッドはキューへ積むだけで、標準出力への書き込みはバックグラウンドのリスナースレッドがまとめて行う
+"""
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+
+# Azure App Service環境とローカル開発環境の両方に対応
+try:
+    from app.config import LOG_LEVEL
+except ImportError:
+    from config import LOG_LEVEL
+
+_log_queue = queue.SimpleQueue()
+_log_stream_handler = logging.StreamHandler(sys.stdout)
+_log_stream_handler.setFormatter(logging.Formatter("[%(name)s] %(message)s"))
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_stream_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+# fork時はリスナースレッドを一旦止め（キューに残ったログは出力してから）、親子それぞれで再開する
+# （スレッドが動いたままforkすると、子プロセスに書き込み途中のロックが引き継がれるため）
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(
+        before=_log_listener.stop,
+        after_in_parent=_log_listener.start,
+        after_in_child=_log_listener.start,
+    )
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    キュー経由で出力するロガーを取得
+
+    Args:
+        name: ログの「[name]」部分（例: "Slack"）
+
+    Returns:
+        LOG_LEVEL を設定済みのロガー（メッセージは %s 形式で渡すと、出力しないレベルでは文字列を組み立てない）
+    """
+    log = logging.getLogger(name)
+    if not log.handlers:
+        log.addHandler(logging.handlers.QueueHandler(_log_queue))
+        log.propagate = False
+    log.setLevel(LOG_LEVEL)
+    return log
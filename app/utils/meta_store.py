@@ -0,0 +1,202 @@
+"""
+メタ情報ストア
+DRAFT_META などのプロセス内辞書を、再起動後も残り複数ワーカー間で共有できるストアに置き換える
+REDIS_URL 設定時はRedis、未設定時はデータディレクトリ内のSQLiteを使用
+"""
+import sqlite3
+import threading
+import time
+from typing import Any, Iterator, Optional, Tuple
+
+import orjson
+
+# Azure App Service環境とローカル開発環境の両方に対応
+try:
+    from app.config import REDIS_URL, DATA_DIR
+except ImportError:
+    from config import REDIS_URL, DATA_DIR
+
+# REDIS_URL 未設定時に使用するSQLiteファイル
+META_DB_PATH = DATA_DIR / "meta.sqlite3"
+
+# Redisに保存するエントリの有効期限（秒、7日）
+DEFAULT_TTL = 7 * 24 * 60 * 60
+
+
+class RedisMetaStore:
+    """
+    Redisに保存する辞書互換ストア
+    値はJSONとして保存し、キーには名前空間のプレフィックスを付与する
+    """
+
+    def __init__(self, client, prefix: str, ttl: Optional[int] = DEFAULT_TTL):
+        self._client = client
+        self._prefix = f"{prefix}:"
+        self._ttl = ttl
+
+    def _key(self, key: str) -> str:
+        return self._prefix + key
+
+    def get(self, key: str, default: Any = None) -> Any:
+        raw = self._client.get(self._key(key))
+        return orjson.loads(raw) if raw is not None else default
+
+    def __getitem__(self, key: str) -> Any:
+        raw = self._client.get(self._key(key))
+        if raw is None:
+            raise KeyError(key)
+        return orjson.loads(raw)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._client.set(self._key(key), orjson.dumps(value), ex=self._ttl)
+
+    def __delitem__(self, key: str) -> None:
+        if not self._client.delete(self._key(key)):
+            raise KeyError(key)
+
+    def __contains__(self, key: str) -> bool:
+        return bool(self._client.exists(self._key(key)))
+
+    def keys(self) -> Iterator[str]:
+        for raw_key in self._client.scan_iter(match=self._prefix + "*"):
+            if isinstance(raw_key, bytes):
+                raw_key = raw_key.decode("utf-8")
+            yield raw_key[len(self._prefix):]
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        for key in list(self.keys()):
+            value = self.get(key)
+            if value is not None:
+                yield key, value
+
+    def values(self) -> Iterator[Any]:
+        for _, value in self.items():
+            yield value
+
+    def __iter__(self) -> Iterator[str]:
+        return self.keys()
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.keys())
+
+    def __bool__(self) -> bool:
+        return next(iter(self.keys()), None) is not None
+
+
+class SqliteMetaStore:
+    """
+    SQLiteに保存する辞書互換ストア（WALモード、複数プロセスから同時に利用可能）
+    値はJSONとして保存し、名前空間ごとに同じテーブルを共有する
+    """
+
+    def __init__(self, path, namespace: str, ttl: Optional[int] = DEFAULT_TTL):
+        self._namespace = namespace
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta ("
+            " namespace TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL, updated_at REAL NOT NULL,"
+            " PRIMARY KEY (namespace, key))"
+        )
+        # 有効期限切れのエントリを起動時に削除
+        if ttl:
+            self._conn.execute(
+                "DELETE FROM meta WHERE namespace = ? AND updated_at < ?",
+                (namespace, time.time() - ttl),
+            )
+
+    def _fetch(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM meta WHERE namespace = ? AND key = ?", (self._namespace, key)
+            ).fetchone()
+        return row[0] if row else None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        raw = self._fetch(key)
+        return orjson.loads(raw) if raw is not None else default
+
+    def __getitem__(self, key: str) -> Any:
+        raw = self._fetch(key)
+        if raw is None:
+            raise KeyError(key)
+        return orjson.loads(raw)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (namespace, key, value, updated_at) VALUES (?, ?, ?, ?)",
+                (self._namespace, key, orjson.dumps(value), time.time()),
+            )
+
+    def __delitem__(self, key: str) -> None:
+        with self._lock:
+            cur = self._conn.execute(
+                "DELETE FROM meta WHERE namespace = ? AND key = ?", (self._namespace, key)
+            )
+        if not cur.rowcount:
+            raise KeyError(key)
+
+    def __contains__(self, key: str) -> bool:
+        return self._fetch(key) is not None
+
+    def keys(self) -> Iterator[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key FROM meta WHERE namespace = ?", (self._namespace,)
+            ).fetchall()
+        return iter([row[0] for row in rows])
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, value FROM meta WHERE namespace = ?", (self._namespace,)
+            ).fetchall()
+        return iter([(key, orjson.loads(value)) for key, value in rows])
+
+    def values(self) -> Iterator[Any]:
+        for _, value in self.items():
+            yield value
+
+    def __iter__(self) -> Iterator[str]:
+        return self.keys()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM meta WHERE namespace = ?", (self._namespace,)
+            ).fetchone()[0]
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+
+def _create_sqlite_store(prefix: str):
+    """SQLiteストアを生成（開けない場合はメモリ上の辞書）"""
+    try:
+        return SqliteMetaStore(META_DB_PATH, prefix)
+    except sqlite3.Error as e:
+        print(f"⚠️ メタ情報DB（{META_DB_PATH}）を開けませんでした: {e}。メモリ上で管理します。")
+        return {}
+
+
+def create_meta_store(prefix: str):
+    """
+    メタ情報ストアを生成する
+    
+    Args:
+        prefix: キーの名前空間（例: "draft_meta"）
+        
+    Returns:
+        REDIS_URL 設定時は RedisMetaStore、未設定時は SqliteMetaStore
+    """
+    if not REDIS_URL:
+        return _create_sqlite_store(prefix)
+    try:
+        import redis
+    except ImportError:
+        print("⚠️ REDIS_URL が設定されていますが redis パッケージが未インストールです。SQLiteで管理します。")
+        return _create_sqlite_store(prefix)
+    return RedisMetaStore(redis.Redis.from_url(REDIS_URL), prefix)
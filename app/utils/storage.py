@@ -2,23 +2,26 @@
 ストレージユーティリティ
 ファイルの保存・読み込みに関するヘルパー関数
 """
-import json
+import os
+import tempfile
 from pathlib import Path
 
+import orjson
 
-def save_json(path: Path, data: dict) -> None:
+
+def save_json(path: Path, data: dict, compact: bool = True) -> None:
     """
     JSONファイルを保存する
     
     Args:
         path: 保存先のパス
         data: 保存するデータ（辞書型）
+        compact: Trueの場合は改行・インデントなしで出力（アプリ自身しか読まないファイル向け）。
+                 人が確認するファイルは False を指定すると2スペースでインデントする
     """
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(
-        json.dumps(data, ensure_ascii=False, indent=2),
-        encoding="utf-8"
-    )
+    # orjsonはUTF-8のバイト列を1回の走査で直接生成するため、文字列の組み立て→再エンコードの2段階を経ずにそのまま書き込む
+    path.write_bytes(orjson.dumps(data, option=None if compact else orjson.OPT_INDENT_2))
 
 
 def load_json(path: Path) -> dict:
@@ -33,10 +36,27 @@ def load_json(path: Path) -> dict:
         
     Raises:
         FileNotFoundError: ファイルが存在しない場合
-        json.JSONDecodeError: JSONの解析に失敗した場合
+        orjson.JSONDecodeError: JSONの解析に失敗した場合（json.JSONDecodeErrorのサブクラス）
     """
-    if not path.exists():
-        raise FileNotFoundError(f"File not found: {path}")
-    
-    return json.loads(path.read_text(encoding="utf-8"))
+    # 存在確認の stat を別途行わず、read_bytes が送出する FileNotFoundError をそのまま伝える
+    return orjson.loads(path.read_bytes())
+
 
+def write_bytes_atomic(path: Path, data: bytes) -> None:
+    """
+    バイト列を一時ファイル経由でアトミックに書き込む
+    
+    Args:
+        path: 保存先のパス
+        data: 書き込むバイト列
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # 同じパスへの同時書き込みで一時ファイルを取り合わないよう、書き込みごとに一意な名前を使う
+    with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp", delete=False) as f:
+        tmp_path = f.name
+        try:
+            f.write(data)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    os.replace(tmp_path, path)
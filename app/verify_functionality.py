@@ -3,53 +3,114 @@
 実際の処理フローが同じであることを確認
 """
 import ast
+import re
 import sys
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Set
 
+# --- 正規表現（すべてモジュール読み込み時に一度だけコンパイルし、関数内ではコンパイルしない） ---
+# post_slack_draft の呼び出しを含む行（def で始まる行を除く。to_thread / run_in_executor 経由の呼び出しを含む）
+_POST_DRAFT_CALL_RE = re.compile(
+    r"^(?![ \t]*def)[^\n]*(?:post_slack_draft\(|(?:to_thread|run_in_executor)\([^\n]*\bpost_slack_draft\b)[^\n]*$",
+    re.MULTILINE,
+)
+# 関数を引数で受け取って実行する呼び出し → 実行される関数の引数位置
+_EXECUTOR_CALLS = {"to_thread": 0, "run_in_executor": 1}
+
+# Phase 1-3のインポート（Azure形式 → ローカル形式の順に探す）
+_REQUIRED_IMPORTS = (
+    "from app.services.slack_service import",
+    "from app.services.openai_service import",
+    "from app.utils.storage import",
+    "from app.config import",
+    "from app.models import",
+)
+_FALLBACK_IMPORTS = (
+    "from services.slack_service import",
+    "from services.openai_service import",
+    "from utils.storage import",
+    "from config import",
+    "from models import",
+)
+
+def _function_info(node) -> Dict:
+    """関数定義ノードから比較用の情報を抽出"""
+    info = {
+        "line": node.lineno,
+        "args": [arg.arg for arg in node.args.args],
+        # デフォルト値を持つ（省略可能な）末尾の引数の数
+        "defaults": len(node.args.defaults),
+        "body_lines": len(node.body),
+        "has_return": any(isinstance(n, ast.Return) for n in ast.walk(node))
+    }
+    if isinstance(node, ast.AsyncFunctionDef):
+        info["async"] = True
+    return info
+
+def _analyze_source(path: str) -> Dict:
+    """
+    ファイルを一度だけ読み込み・解析し、比較に必要な情報をまとめて作成
+    戻り値: {"funcs": 関数名 → 関数情報, "calls": 関数名 → 呼び出し行のリスト,
+             "post_draft_calls": post_slack_draft の呼び出し行, "first_import": 最初に見つかったインポート文}
+    """
+    content = Path(path).read_text(encoding="utf-8")
+    tree = ast.parse(content, filename=path)
+    funcs = {}
+    calls = {}
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            # 同名の関数が複数ある場合は最初に見つかったものを使う
+            if node.name not in funcs:
+                funcs[node.name] = _function_info(node)
+        elif isinstance(node, ast.Call):
+            if isinstance(node.func, ast.Name):
+                # メソッド呼び出し（ast.Attribute）は対象外
+                calls.setdefault(node.func.id, []).append(f"line {node.lineno}")
+            # asyncio.to_thread(func, ...) / loop.run_in_executor(executor, func, ...) は func の呼び出しとして数える
+            executor_name = node.func.attr if isinstance(node.func, ast.Attribute) else getattr(node.func, "id", None)
+            index = _EXECUTOR_CALLS.get(executor_name)
+            if index is not None and len(node.args) > index and isinstance(node.args[index], ast.Name):
+                calls.setdefault(node.args[index].id, []).append(f"line {node.lineno}")
+    return {
+        "funcs": funcs,
+        "calls": calls,
+        "post_draft_calls": _find_call_lines(content),
+        "first_import": next((line for line in _REQUIRED_IMPORTS + _FALLBACK_IMPORTS if line in content), None),
+    }
+
+@lru_cache(maxsize=4)
+def _analyze(path: str) -> Dict:
+    """ファイルの解析結果を取得（1回の実行中は同じファイルを再解析しない）"""
+    return _analyze_source(path)
+
 def extract_function_body_signature(file_path: Path, func_name: str) -> Dict:
     """関数の本体とシグネチャを抽出"""
     try:
-        content = file_path.read_text(encoding="utf-8")
-        tree = ast.parse(content, filename=str(file_path))
+        funcs = _analyze(str(file_path))["funcs"]
     except Exception as e:
         return {"error": str(e)}
     
-    for node in ast.walk(tree):
-        if isinstance(node, ast.FunctionDef) and node.name == func_name:
-            return {
-                "line": node.lineno,
-                "args": [arg.arg for arg in node.args.args],
-                "body_lines": len(node.body),
-                "has_return": any(isinstance(n, ast.Return) for n in ast.walk(node))
-            }
-        elif isinstance(node, ast.AsyncFunctionDef) and node.name == func_name:
-            return {
-                "line": node.lineno,
-                "args": [arg.arg for arg in node.args.args],
-                "body_lines": len(node.body),
-                "has_return": any(isinstance(n, ast.Return) for n in ast.walk(node)),
-                "async": True
-            }
-    return {"error": "Function not found"}
+    info = funcs.get(func_name)
+    if info is None:
+        return {"error": "Function not found"}
+    return dict(info)
 
 def check_function_usage(file_path: Path, func_name: str) -> List[str]:
     """関数の使用箇所を抽出"""
     try:
-        content = file_path.read_text(encoding="utf-8")
-        tree = ast.parse(content, filename=str(file_path))
+        calls_by_name = _analyze(str(file_path))["calls"]
     except Exception as e:
         return [f"Error: {e}"]
-    
-    usages = []
-    for node in ast.walk(tree):
-        if isinstance(node, ast.Call):
-            if isinstance(node.func, ast.Name) and node.func.id == func_name:
-                usages.append(f"line {node.lineno}")
-            elif isinstance(node.func, ast.Attribute):
-                # メソッド呼び出しの場合はスキップ
-                pass
-    return usages
+    return list(calls_by_name.get(func_name, []))
+
+def count_function_calls(file_path: Path, func_name: str) -> int:
+    """関数の呼び出し回数を索引から取得（解析エラー時は -1）"""
+    try:
+        calls_by_name = _analyze(str(file_path))["calls"]
+    except Exception:
+        return -1
+    return len(calls_by_name.get(func_name, ()))
 
 def compare_pipeline_functions():
     """パイプライン関数（process_pipeline, process_text_pipeline）の比較"""
@@ -72,17 +133,21 @@ def compare_pipeline_functions():
             print(f"    ✗ 新しいファイル: {new_info['error']}")
             continue
         
-        # 引数の比較
-        if original_info["args"] == new_info["args"]:
-            print(f"    ✓ 引数は同じ: {original_info['args']}")
+        # 引数の比較（新しいファイルで末尾に追加された省略可能な引数は許容）
+        original_args, new_args = original_info["args"], new_info["args"]
+        added_args = new_args[len(original_args):]
+        if original_args == new_args:
+            print(f"    ✓ 引数は同じ: {original_args}")
+        elif new_args[:len(original_args)] == original_args and len(added_args) <= new_info.get("defaults", 0):
+            print(f"    ✓ 引数は互換: {original_args}（省略可能な引数を追加: {added_args}）")
         else:
             print(f"    ✗ 引数が異なります")
             print(f"      元: {original_info['args']}")
             print(f"      新: {new_info['args']}")
         
         # 使用されている関数の確認
-        original_usage = check_function_usage(original_path, func_name)
-        new_usage = check_function_usage(new_path, func_name)
+        original_usage = count_function_calls(original_path, func_name)
+        new_usage = count_function_calls(new_path, func_name)
         
         if original_usage and new_usage:
             print(f"    ✓ 両方で使用されています")
@@ -91,6 +156,20 @@ def compare_pipeline_functions():
         elif not original_usage and new_usage:
             print(f"    ⚠ 元のファイルでは未使用、新しいファイルでは使用")
 
+def _find_call_lines(content: str) -> List[str]:
+    """
+    post_slack_draft の呼び出しを含む行（def行を除く）をファイル全体への1回の正規表現走査で抽出
+    戻り値: 「line 行番号: 行の内容」のリスト
+    """
+    calls = []
+    lineno, pos = 1, 0
+    for m in _POST_DRAFT_CALL_RE.finditer(content):
+        # 直前のマッチ位置からの改行数だけを数えて行番号を求める
+        lineno += content.count("\n", pos, m.start())
+        pos = m.start()
+        calls.append(f"line {lineno}: {m.group(0).strip()}")
+    return calls
+
 def compare_post_slack_draft():
     """post_slack_draft関数の呼び出し方法の比較"""
     original_path = Path("main_original_backup.py")
@@ -100,26 +179,14 @@ def compare_post_slack_draft():
     
     # 元のファイルでの呼び出し
     try:
-        original_content = original_path.read_text(encoding="utf-8")
-        original_lines = original_content.splitlines()
-        
-        original_calls = []
-        for i, line in enumerate(original_lines, 1):
-            if "post_slack_draft(" in line and not line.strip().startswith("def"):
-                original_calls.append(f"line {i}: {line.strip()}")
+        original_calls = _analyze(str(original_path))["post_draft_calls"]
     except Exception as e:
         print(f"    ✗ エラー: {e}")
         return
     
     # 新しいファイルでの呼び出し
     try:
-        new_content = new_path.read_text(encoding="utf-8")
-        new_lines = new_content.splitlines()
-        
-        new_calls = []
-        for i, line in enumerate(new_lines, 1):
-            if "post_slack_draft(" in line and not line.strip().startswith("def"):
-                new_calls.append(f"line {i}: {line.strip()}")
+        new_calls = _analyze(str(new_path))["post_draft_calls"]
     except Exception as e:
         print(f"    ✗ エラー: {e}")
         return
@@ -169,30 +236,11 @@ def main():
     # インポートの確認
     print("\n[詳細比較] インポート文の確認...")
     try:
-        new_content = new_path.read_text(encoding="utf-8")
-        
-        # Phase 1-3のインポートが正しく行われているか
-        required_imports = [
-            "from app.services.slack_service import",
-            "from app.services.openai_service import",
-            "from app.utils.storage import",
-            "from app.config import",
-            "from app.models import",
-        ]
-        
-        fallback_imports = [
-            "from services.slack_service import",
-            "from services.openai_service import",
-            "from utils.storage import",
-            "from config import",
-            "from models import",
-        ]
+        first_import = _analyze(str(new_path))["first_import"]
         
         all_imports_found = True
-        for import_line in required_imports + fallback_imports:
-            if import_line in new_content:
-                print(f"    ✓ {import_line} が見つかりました")
-                break
+        if first_import:
+            print(f"    ✓ {first_import} が見つかりました")
         else:
             # どちらも見つからない場合
             print(f"    ✗ 必要なインポートが見つかりません")
@@ -3,35 +3,145 @@ Phase 6実装後の詳細な機能比較スクリプト
 処理フローが同じであることを確認
 """
 import ast
+import os
+import re
 import sys
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List, Optional, Tuple
+
+@lru_cache(maxsize=32)
+def _load(path_str: str, mtime_ns: int, size: int) -> Tuple[str, List[str]]:
+    """ファイルの内容と行リストを一度だけ作成してキャッシュ（更新日時とサイズが変われば作り直す）"""
+    # ファイル全体を一度に読むため、テキストラッパーを介さずバイト列で読み込んでからデコード
+    content = Path(path_str).read_bytes().decode("utf-8")
+    return content, content.splitlines()
+
+@lru_cache(maxsize=32)
+def _parse(path_str: str, mtime_ns: int, size: int) -> ast.Module:
+    """ファイルのASTを一度だけ作成してキャッシュ（行単位の比較だけなら解析しない）"""
+    return ast.parse(_load(path_str, mtime_ns, size)[0], filename=path_str)
+
+@lru_cache(maxsize=32)
+def _stat(path_str: str) -> Optional[os.stat_result]:
+    """ファイルの stat を実行中に一度だけ取得（存在しない場合は None）"""
+    try:
+        return os.stat(path_str)
+    except OSError:
+        return None
+
+def _cache_key(path: Path) -> Tuple[str, int, int]:
+    """読み込み・解析・走査のキャッシュキー（パス, 更新日時, サイズ）"""
+    st = _stat(str(path))
+    if st is None:
+        raise FileNotFoundError(f"File not found: {path}")
+    return str(path), st.st_mtime_ns, st.st_size
+
+def load(path: Path) -> Tuple[str, List[str]]:
+    """ファイルの内容と行リストを取得（同じファイルを何度も読み込まない）"""
+    return _load(*_cache_key(path))
+
+def parse(path: Path) -> ast.Module:
+    """ファイルのASTを取得（同じファイルを何度も解析しない）"""
+    return _parse(*_cache_key(path))
+
+# schedule_task_reminders の呼び出し（直接呼び出しに加え、asyncio.to_thread / run_in_executor 経由も対象）
+_REMINDER_CALL_RE = re.compile(r'schedule_task_reminders\(|(?:to_thread|run_in_executor)\([^\n]*\bschedule_task_reminders\b')
+
+@lru_cache(maxsize=32)
+def _scan(path_str: str, mtime_ns: int, size: int) -> List[int]:
+    """ファイル全体を1回だけ走査し、schedule_task_reminders の呼び出し行を記録"""
+    content, _ = _load(path_str, mtime_ns, size)
+    rows = []
+    lineno, pos = 1, 0
+    for m in _REMINDER_CALL_RE.finditer(content):
+        start = m.start()
+        # 直前のマッチ位置からの改行数だけを数えて行番号を求める
+        lineno += content.count("\n", pos, start)
+        pos = start
+        if not rows or rows[-1] != lineno:
+            rows.append(lineno)
+    return rows
+
+def scan(path: Path) -> List[int]:
+    """ファイルの走査結果を取得（load と同じキーでキャッシュ）"""
+    return _scan(*_cache_key(path))
+
+def _is_task_complete_branch(node: ast.AST) -> bool:
+    """if action_id == "task_complete": の分岐か"""
+    if not isinstance(node, ast.If) or not isinstance(node.test, ast.Compare):
+        return False
+    test = node.test
+    return (
+        isinstance(test.left, ast.Name) and test.left.id == "action_id"
+        and len(test.ops) == 1 and isinstance(test.ops[0], ast.Eq)
+        and isinstance(test.comparators[0], ast.Constant) and test.comparators[0].value == "task_complete"
+    )
+
+def _find_task_complete_branch(node: ast.AST) -> Optional[ast.If]:
+    """task_complete の分岐を子ノードを順にたどって探す（見つかった時点で探索を終了）"""
+    for child in ast.iter_child_nodes(node):
+        if _is_task_complete_branch(child):
+            return child
+        found = _find_task_complete_branch(child)
+        if found is not None:
+            return found
+    return None
+
+def _referenced_names(node: ast.AST) -> set:
+    """ノード内で参照されている名前（関数名・属性名）"""
+    names = set()
+    for n in ast.walk(node):
+        if isinstance(n, ast.Name):
+            names.add(n.id)
+        elif isinstance(n, ast.Attribute):
+            names.add(n.attr)
+    return names
+
+def task_complete_branch(path: Path) -> Optional[Tuple[int, int, set]]:
+    """
+    task_complete分岐の開始行・終了行と、分岐内で参照されている名前を取得（見つからない場合は None）
+    分岐から参照されているモジュール直下の関数（バックグラウンド処理など）の中身も1段だけたどる
+    """
+    tree = parse(path)
+    branch = _find_task_complete_branch(tree)
+    if branch is None:
+        return None
+    names = _referenced_names(branch)
+    funcs = _top_level_functions(tree)
+    for name in list(names):
+        if name in funcs:
+            names |= _referenced_names(funcs[name])
+    return branch.lineno, branch.end_lineno, names
+
+@lru_cache(maxsize=32)
+def _top_level_functions(tree: ast.Module) -> Dict[str, ast.AST]:
+    """モジュール直下の関数定義の索引（関数名 → ノード）。全ノードを走査せず tree.body だけを見る"""
+    funcs = {}
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            funcs.setdefault(node.name, node)
+    return funcs
 
 def extract_function_body(file_path: Path, func_name: str) -> Dict:
     """関数の本体を抽出"""
     try:
-        content = file_path.read_text(encoding="utf-8")
-        tree = ast.parse(content, filename=str(file_path))
+        tree = parse(file_path)
     except Exception as e:
         return {"error": str(e)}
     
-    for node in ast.walk(tree):
-        if isinstance(node, ast.FunctionDef) and node.name == func_name:
-            return {
-                "line": node.lineno,
-                "end_line": node.end_lineno if hasattr(node, 'end_lineno') else None,
-                "args": [arg.arg for arg in node.args.args],
-                "body_length": len(node.body)
-            }
-        elif isinstance(node, ast.AsyncFunctionDef) and node.name == func_name:
-            return {
-                "line": node.lineno,
-                "end_line": node.end_lineno if hasattr(node, 'end_lineno') else None,
-                "args": [arg.arg for arg in node.args.args],
-                "body_length": len(node.body),
-                "async": True
-            }
-    return {"error": "Function not found"}
+    node = _top_level_functions(tree).get(func_name)
+    if node is None:
+        return {"error": "Function not found"}
+    info = {
+        "line": node.lineno,
+        "end_line": node.end_lineno if hasattr(node, 'end_lineno') else None,
+        "args": [arg.arg for arg in node.args.args],
+        "body_length": len(node.body)
+    }
+    if isinstance(node, ast.AsyncFunctionDef):
+        info["async"] = True
+    return info
 
 def compare_task_complete_implementation():
     """task_complete処理の実装を比較"""
@@ -41,41 +151,19 @@ def compare_task_complete_implementation():
     print("\n[詳細比較] task_complete処理の実装...")
     
     try:
-        original_content = original_path.read_text(encoding="utf-8")
-        original_lines = original_content.splitlines()
-        
-        new_content = new_path.read_text(encoding="utf-8")
-        new_lines = new_content.splitlines()
+        # task_complete処理の分岐をASTから構造的に探す（インデントや書式の変更に左右されない）
+        original_branch = task_complete_branch(original_path)
+        new_branch = task_complete_branch(new_path)
         
-        # 元のファイルでのtask_complete処理
-        original_start = None
-        original_end = None
-        for i, line in enumerate(original_lines, 1):
-            if 'if action_id == "task_complete":' in line:
-                original_start = i
-            if original_start and i > original_start and line.strip() and not line.startswith(' ') and not line.startswith('\t'):
-                if 'if action_id ==' in line or 'return JSONResponse' in line:
-                    original_end = i - 1
-                    break
-        
-        # 新しいファイルでのtask_complete処理
-        new_start = None
-        new_end = None
-        for i, line in enumerate(new_lines, 1):
-            if 'if action_id == "task_complete":' in line:
-                new_start = i
-            if new_start and i > new_start and line.strip() and not line.startswith(' ') and not line.startswith('\t'):
-                if 'if action_id ==' in line or 'return JSONResponse' in line:
-                    new_end = i - 1
-                    break
-        
-        if original_start and new_start:
-            print(f"  元の実装: line {original_start}-{original_end or '?'} ({original_end - original_start if original_end else '?'}行)")
-            print(f"  新しい実装: line {new_start}-{new_end or '?'} ({new_end - new_start if new_end else '?'}行)")
+        if original_branch and new_branch:
+            original_start, original_end, _ = original_branch
+            new_start, new_end, new_names = new_branch
+            print(f"  元の実装: line {original_start}-{original_end} ({original_end - original_start}行)")
+            print(f"  新しい実装: line {new_start}-{new_end} ({new_end - new_start}行)")
             
             # 新しい実装がサービスを使用しているか確認
-            uses_mark_task_complete = any('mark_task_complete' in line for line in new_lines[new_start-1:new_end or len(new_lines)])
-            uses_update_task_block = any('update_task_block_in_slack' in line for line in new_lines[new_start-1:new_end or len(new_lines)])
+            uses_mark_task_complete = "mark_task_complete" in new_names
+            uses_update_task_block = "update_task_block_in_slack" in new_names
             
             if uses_mark_task_complete and uses_update_task_block:
                 print(f"    ✓ 新しい実装はtask_serviceを使用しています")
@@ -90,6 +178,13 @@ def compare_task_complete_implementation():
         import traceback
         traceback.print_exc()
 
+def _usage_with_context(lines: List[str], i: int) -> str:
+    """呼び出し行（i行目）とその前後のコンテキストを整形"""
+    context_start = max(0, i - 2)
+    context_end = min(len(lines), i + 2)
+    context = "\n".join(f"  {j}: {lines[j-1]}" for j in range(context_start+1, context_end+1))
+    return f"line {i}\n{context}"
+
 def compare_schedule_task_reminders_usage():
     """schedule_task_remindersの使用箇所を比較"""
     original_path = Path("main_original_backup.py")
@@ -98,37 +193,20 @@ def compare_schedule_task_reminders_usage():
     print("\n[詳細比較] schedule_task_remindersの使用箇所...")
     
     try:
-        original_content = original_path.read_text(encoding="utf-8")
-        original_lines = original_content.splitlines()
-        
-        new_content = new_path.read_text(encoding="utf-8")
-        new_lines = new_content.splitlines()
-        
-        original_usage = []
-        for i, line in enumerate(original_lines, 1):
-            if "schedule_task_reminders(" in line and not line.strip().startswith("def"):
-                # 前後のコンテキストを取得
-                context_start = max(0, i - 2)
-                context_end = min(len(original_lines), i + 2)
-                context = "\n".join([f"  {j}: {original_lines[j-1]}" for j in range(context_start+1, context_end+1)])
-                original_usage.append(f"line {i}\n{context}")
+        _, original_lines = load(original_path)
+        _, new_lines = load(new_path)
         
-        new_usage = []
-        for i, line in enumerate(new_lines, 1):
-            if "schedule_task_reminders(" in line and not line.strip().startswith("def"):
-                # 前後のコンテキストを取得
-                context_start = max(0, i - 2)
-                context_end = min(len(new_lines), i + 2)
-                context = "\n".join([f"  {j}: {new_lines[j-1]}" for j in range(context_start+1, context_end+1)])
-                new_usage.append(f"line {i}\n{context}")
+        # 呼び出し行の行番号だけを集め、表示する先頭の1件だけ前後のコンテキストを組み立てる
+        original_usage = [i for i in scan(original_path) if not original_lines[i-1].lstrip().startswith("def")]
+        new_usage = [i for i in scan(new_path) if not new_lines[i-1].lstrip().startswith("def")]
         
         print(f"    元のファイル: {len(original_usage)}箇所")
         if original_usage:
-            print(f"      {original_usage[0][:200]}...")
+            print(f"      {_usage_with_context(original_lines, original_usage[0])[:200]}...")
         
         print(f"    新しいファイル: {len(new_usage)}箇所")
         if new_usage:
-            print(f"      {new_usage[0][:200]}...")
+            print(f"      {_usage_with_context(new_lines, new_usage[0])[:200]}...")
         
         if len(original_usage) == len(new_usage):
             print(f"    ✓ 呼び出し箇所の数は同じです")
@@ -144,7 +222,7 @@ def check_task_service_imports():
     print("\n[詳細比較] task_serviceのインポート確認...")
     
     try:
-        content = new_path.read_text(encoding="utf-8")
+        content, _ = load(new_path)
         
         # Phase 6のインポートが正しく行われているか
         required_imports = [
@@ -184,10 +262,10 @@ def main():
     original_path = Path("main_original_backup.py")
     new_path = Path("main.py")
     
-    if not original_path.exists():
+    if _stat(str(original_path)) is None:
         print(f"✗ エラー: {original_path} が見つかりません")
         sys.exit(1)
-    if not new_path.exists():
+    if _stat(str(new_path)) is None:
         print(f"✗ エラー: {new_path} が見つかりません")
         sys.exit(1)
     
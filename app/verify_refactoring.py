@@ -2,7 +2,9 @@
 デプロイ後のリファクタリング確認スクリプト
 Phase 1とPhase 2までのモジュールが正しく動作するか確認
 """
+import os
 import sys
+from functools import lru_cache
 from pathlib import Path
 
 print("=" * 70)
@@ -22,6 +24,33 @@ expected_files = {
     }
 }
 
+# config.py に必要な属性（表示順を保つためタプルで定義）
+REQUIRED_CONFIG_ATTRS = (
+    "OPENAI_API_KEY", "SLACK_BOT_TOKEN", "DEFAULT_SLACK_CHANNEL",
+    "client_oa", "client_slack",
+    "BASE_DIR", "DATA_DIR", "UPLOAD_DIR", "TRANS_DIR", "SUMM_DIR", "PDF_DIR"
+)
+
+# Draftモデルに必要なフィールド
+EXPECTED_DRAFT_FIELDS = (
+    "title", "summary", "decisions", "actions", "issues",
+    "meeting_name", "datetime_str", "participants", "purpose", "risks"
+)
+
+@lru_cache(maxsize=None)
+def _dir_entries(directory: str) -> frozenset:
+    """ディレクトリ内の名前一覧を os.scandir で一度だけ取得（ファイルごとに stat しない）"""
+    try:
+        with os.scandir(directory) as it:
+            return frozenset(entry.name for entry in it)
+    except OSError:
+        return frozenset()
+
+def exists(rel_path: str) -> bool:
+    """相対パスのファイルが存在するか（同じディレクトリの一覧を使い回す）"""
+    directory, _, name = rel_path.rpartition("/")
+    return name in _dir_entries(directory or ".")
+
 # 結果を記録
 results = {
     "Phase 1": {"passed": 0, "failed": 0, "errors": []},
@@ -36,24 +65,19 @@ print("=" * 70)
 # 1. config.py の確認
 print("\n[1] config.py の確認")
 try:
-    if Path("config.py").exists():
+    if exists("config.py"):
         import config
         print("  ✓ config.py が存在します")
         
-        # 必要な属性の確認
-        required_attrs = [
-            "OPENAI_API_KEY", "SLACK_BOT_TOKEN", "DEFAULT_SLACK_CHANNEL",
-            "client_oa", "client_slack",
-            "BASE_DIR", "DATA_DIR", "UPLOAD_DIR", "TRANS_DIR", "SUMM_DIR", "PDF_DIR"
-        ]
+        # 必要な属性の確認（属性名の集合を一度だけ作成し、hasattr を属性ごとに呼ばない）
+        config_names = frozenset(vars(config))
         
-        missing_attrs = []
-        for attr in required_attrs:
-            if hasattr(config, attr):
-                print(f"    ✓ {attr} が存在します")
-            else:
-                missing_attrs.append(attr)
-                print(f"    ✗ {attr} が存在しません")
+        # 結果の行はまとめて1回で出力
+        missing_attrs = [attr for attr in REQUIRED_CONFIG_ATTRS if attr not in config_names]
+        print("\n".join(
+            f"    ✓ {attr} が存在します" if attr in config_names else f"    ✗ {attr} が存在しません"
+            for attr in REQUIRED_CONFIG_ATTRS
+        ))
         
         if not missing_attrs:
             print("  ✓ config.py のすべての属性が正しく定義されています")
@@ -74,33 +98,21 @@ except Exception as e:
 # 2. models.py の確認
 print("\n[2] models.py の確認")
 try:
-    if Path("models.py").exists():
+    if exists("models.py"):
         from models import Draft
         print("  ✓ models.py が存在します")
         
-        # Draftモデルの確認
+        # Draftモデルの確認（インスタンスを作成して検証を走らせず、モデルクラスのフィールド定義を直接参照）
         try:
-            test_draft = Draft(
-                title="テスト",
-                summary="テストサマリー",
-                decisions="決定事項",
-                actions="アクション",
-                issues="課題"
-            )
+            draft_fields = frozenset(Draft.model_fields)
             print("  ✓ Draftモデルが正しく定義されています")
             
             # フィールドの確認
-            expected_fields = [
-                "title", "summary", "decisions", "actions", "issues",
-                "meeting_name", "datetime_str", "participants", "purpose", "risks"
-            ]
-            missing_fields = []
-            for field in expected_fields:
-                if hasattr(test_draft, field):
-                    print(f"    ✓ {field} フィールドが存在します")
-                else:
-                    missing_fields.append(field)
-                    print(f"    ✗ {field} フィールドが存在しません")
+            missing_fields = [field for field in EXPECTED_DRAFT_FIELDS if field not in draft_fields]
+            print("\n".join(
+                f"    ✓ {field} フィールドが存在します" if field in draft_fields else f"    ✗ {field} フィールドが存在しません"
+                for field in EXPECTED_DRAFT_FIELDS
+            ))
             
             if not missing_fields:
                 print("  ✓ Draftモデルのすべてのフィールドが正しく定義されています")
@@ -110,9 +122,9 @@ try:
                 results["Phase 1"]["failed"] += 1
                 results["Phase 1"]["errors"].append(f"models.py: 不足フィールド {missing_fields}")
         except Exception as e:
-            print(f"  ✗ Draftモデルの作成に失敗: {e}")
+            print(f"  ✗ Draftモデルの確認に失敗: {e}")
             results["Phase 1"]["failed"] += 1
-            results["Phase 1"]["errors"].append(f"models.py: Draft作成エラー - {e}")
+            results["Phase 1"]["errors"].append(f"models.py: Draft確認エラー - {e}")
     else:
         print("  ✗ models.py が存在しません")
         results["Phase 1"]["failed"] += 1
@@ -125,8 +137,7 @@ except Exception as e:
 # 3. utils/storage.py の確認
 print("\n[3] utils/storage.py の確認")
 try:
-    storage_path = Path("utils/storage.py")
-    if storage_path.exists():
+    if exists("utils/storage.py"):
         from utils.storage import save_json, load_json
         print("  ✓ utils/storage.py が存在します")
         
@@ -134,31 +145,34 @@ try:
         if callable(save_json) and callable(load_json):
             print("  ✓ save_json と load_json が正しく定義されています")
             
-            # 簡単な動作確認（一時ファイルで）
+            # 簡単な動作確認（一時ファイルで。ディレクトリは作らず、ファイル1つだけを作成・削除）
             import tempfile
-            with tempfile.TemporaryDirectory() as tmpdir:
-                test_file = Path(tmpdir) / "test.json"
-                test_data = {"test": "data", "number": 123}
-                
-                try:
-                    save_json(test_file, test_data)
-                    if test_file.exists():
-                        loaded = load_json(test_file)
-                        if loaded == test_data:
-                            print("  ✓ save_json と load_json が正常に動作します")
-                            results["Phase 1"]["passed"] += 1
-                        else:
-                            print("  ✗ save_json と load_json の動作に問題があります")
-                            results["Phase 1"]["failed"] += 1
-                            results["Phase 1"]["errors"].append("utils/storage.py: 動作確認失敗")
+            with tempfile.NamedTemporaryFile("wb", suffix=".json", delete=False) as tf:
+                test_file = Path(tf.name)
+            test_data = {"test": "data", "number": 123}
+            
+            try:
+                save_json(test_file, test_data)
+                # 一時ファイルは空で作成済みのため、中身が書き込まれたかで判定
+                if test_file.stat().st_size:
+                    loaded = load_json(test_file)
+                    if loaded == test_data:
+                        print("  ✓ save_json と load_json が正常に動作します")
+                        results["Phase 1"]["passed"] += 1
                     else:
-                        print("  ✗ save_json でファイルが作成されませんでした")
+                        print("  ✗ save_json と load_json の動作に問題があります")
                         results["Phase 1"]["failed"] += 1
-                        results["Phase 1"]["errors"].append("utils/storage.py: ファイル作成失敗")
-                except Exception as e:
-                    print(f"  ✗ 動作確認中にエラー: {e}")
+                        results["Phase 1"]["errors"].append("utils/storage.py: 動作確認失敗")
+                else:
+                    print("  ✗ save_json でファイルが作成されませんでした")
                     results["Phase 1"]["failed"] += 1
-                    results["Phase 1"]["errors"].append(f"utils/storage.py: 動作確認エラー - {e}")
+                    results["Phase 1"]["errors"].append("utils/storage.py: ファイル作成失敗")
+            except Exception as e:
+                print(f"  ✗ 動作確認中にエラー: {e}")
+                results["Phase 1"]["failed"] += 1
+                results["Phase 1"]["errors"].append(f"utils/storage.py: 動作確認エラー - {e}")
+            finally:
+                test_file.unlink(missing_ok=True)
         else:
             print("  ✗ save_json または load_json が正しく定義されていません")
             results["Phase 1"]["failed"] += 1
@@ -180,8 +194,7 @@ print("=" * 70)
 # 4. services/openai_service.py の確認
 print("\n[4] services/openai_service.py の確認")
 try:
-    oai_service_path = Path("services/openai_service.py")
-    if oai_service_path.exists():
+    if exists("services/openai_service.py"):
         from services.openai_service import transcribe_audio, summarize_to_structured
         print("  ✓ services/openai_service.py が存在します")
         
@@ -216,8 +229,7 @@ except Exception as e:
 # 5. services/__init__.py の確認
 print("\n[5] services/__init__.py の確認")
 try:
-    services_init_path = Path("services/__init__.py")
-    if services_init_path.exists():
+    if exists("services/__init__.py"):
         import services
         print("  ✓ services/__init__.py が存在します")
         print("  ✓ services パッケージとして正しく認識されます")